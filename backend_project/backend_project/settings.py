@@ -139,6 +139,70 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Rows per batch used by the equipment bulk loader
+EQUIPMENT_BULK_LOAD_BATCH_SIZE = 5000
+
+# Server-sent events poll interval and maximum stream length (clients reconnect)
+LIVE_SSE_POLL_INTERVAL = 1.0
+LIVE_SSE_MAX_SECONDS = 300
+
+# Width of the time buckets old datasets are compacted into
+ROLLUP_BUCKET_SECONDS = 3600
+
+# Parallel statistics: pool size (None = all cores), rows per chunk, and the
+# stored row count above which summaries use the chunked engine instead of pandas
+PARALLEL_STATS_WORKERS = None
+PARALLEL_STATS_CHUNK_ROWS = 250_000
+PARALLEL_STATS_MIN_ROWS = 1_000_000
+
+# Upload validation rules per column (aliases, numeric min/max, pattern,
+# allowed values, max_length). None uses equipment.validation.DEFAULT_RULES.
+EQUIPMENT_VALIDATION_RULES = None
+
+# Import pandas/ReportLab at startup instead of on first use. Enable for
+# pre-fork servers (e.g. gunicorn --preload) so workers share the pages.
+EQUIPMENT_PRELOAD_HEAVY_MODULES = False
+
+# Admission control for heavy endpoints. Keys override
+# equipment.admission.DEFAULT_LIMITS: rate_per_minute, burst, max_concurrent,
+# max_concurrent_per_user, max_queue, queue_timeout (seconds). Per-user rate
+# and concurrency counters live in EQUIPMENT_ADMISSION_CACHE, which must be a
+# cache shared by all workers (Redis, Memcached) for the limits to hold
+# across them; max_concurrent and the wait queue are per worker process.
+EQUIPMENT_ADMISSION_ENABLED = True
+EQUIPMENT_ADMISSION_CACHE = 'default'
+EQUIPMENT_ADMISSION = {
+    'upload': {'rate_per_minute': 20, 'burst': 5, 'max_concurrent': 2, 'max_concurrent_per_user': 1},
+    'report': {'rate_per_minute': 30, 'burst': 5, 'max_concurrent': 2, 'max_concurrent_per_user': 1},
+    'query': {'rate_per_minute': 60, 'burst': 10, 'max_concurrent': 4, 'max_concurrent_per_user': 2},
+}
+
+# Per-request budgets ('upload', 'summary', 'report' or 'default'). Work that
+# wouldn't fit max_memory_mb in memory is done in chunks; requests over
+# max_rows (413) or over the memory budget even when chunked (503) fail.
+EQUIPMENT_MEMORY_BUDGETS = {
+    'default': {'max_memory_mb': 512, 'max_rows': 5_000_000},
+    'report': {'max_memory_mb': 256, 'max_rows': 2_000_000},
+}
+# Measure Python allocations with tracemalloc instead of RSS (slow; debugging only)
+EQUIPMENT_MEMORY_TRACEMALLOC = False
+
+# Limits for /api/query/: rows a query may scan, groups returned, time limit
+# (seconds) and rows kept in each worker's column cache.
+EQUIPMENT_QUERY_LIMITS = {
+    'max_scan_rows': 2_000_000,
+    'max_groups': 1000,
+    'timeout': 5.0,
+    'column_cache_rows': 2_000_000,
+}
+
+# Per-tenant retention ("user:<id>", "team:<group id>", "public" or "default").
+# Datasets beyond max_datasets, or beyond max_rows in total, are compacted
+# into rollups oldest first; the newest dataset is always kept raw.
+EQUIPMENT_TENANT_QUOTAS = {
+    'default': {'max_datasets': 5, 'max_rows': None},
+}
+
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
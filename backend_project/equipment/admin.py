@@ -1,14 +1,155 @@
 from django.contrib import admin
-from .models import Equipment, Dataset
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.functional import cached_property
+from .models import Equipment, Dataset, EquipmentRollup, ValidationReport
+from .caching import get_equipment_types
+
+# Filtered changelists never count more than this many rows
+ADMIN_COUNT_CAP = 100_000
+# Seconds a whole-table count is reused on backends without row estimates
+ADMIN_COUNT_CACHE_TIMEOUT = 300
+
+
+def estimate_row_count(model):
+    """Cheap row count for a whole table, or None if the backend has none"""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] >= 0 else None
+    if connection.vendor == 'sqlite':
+        # SQLite keeps no row estimate; an exact count is taken at most once per timeout
+        key = f'equipment:admin:count:{model._meta.db_table}'
+        count = cache.get(key)
+        if count is None:
+            count = model._default_manager.order_by().count()
+            cache.set(key, count, ADMIN_COUNT_CACHE_TIMEOUT)
+        return count
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids exact COUNT(*) over large tables"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimate_row_count(queryset.model)
+            if estimate is not None:
+                return estimate
+        # Filtered lists are counted only up to a cap
+        return queryset.order_by()[:ADMIN_COUNT_CAP].count()
+
+
+class DatasetScopeFilter(admin.SimpleListFilter):
+    """Scopes the changelist to the latest dataset unless 'All' is picked"""
+    title = 'dataset'
+    parameter_name = 'dataset'
+
+    def lookups(self, request, model_admin):
+        # The newest datasets, plus the selected one; every dataset links here from its admin list
+        datasets = list(Dataset.objects.all()[:5])
+        selected = self.used_parameters.get(self.parameter_name)
+        if selected and selected.isdigit() and int(selected) not in {ds.id for ds in datasets}:
+            datasets += list(Dataset.objects.filter(id=selected))
+        return [(str(ds.id), str(ds)) for ds in datasets]
+
+    @cached_property
+    def latest_dataset_id(self):
+        return Dataset.objects.values_list('id', flat=True).first()
+
+    def value(self):
+        value = super().value()
+        if value is None:
+            latest = self.latest_dataset_id
+            return str(latest) if latest is not None else 'all'
+        return value
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() == 'all',
+            'query_string': changelist.get_query_string({self.parameter_name: 'all'}),
+            'display': 'All',
+        }
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': self.value() == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+    def queryset(self, request, queryset):
+        value = self.value()
+        if value == 'all':
+            return queryset
+        if not value.isdigit():
+            raise IncorrectLookupParameters(f"Invalid dataset id: {value!r}")
+        return queryset.filter(dataset_id=value)
+
+
+class EquipmentTypeFilter(admin.SimpleListFilter):
+    """Equipment type filter backed by the cached distinct values"""
+    title = 'equipment type'
+    parameter_name = 'equipment_type'
+
+    def lookups(self, request, model_admin):
+        return [(t, t) for t in get_equipment_types()]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(equipment_type=self.value())
+        return queryset
+
 
 @admin.register(Dataset)
 class DatasetAdmin(admin.ModelAdmin):
-    list_display = ['filename', 'uploaded_at', 'total_records']
+    list_display = ['filename', 'uploaded_at', 'total_records', 'equipment_link']
     list_filter = ['uploaded_at']
     search_fields = ['filename']
 
+    @admin.display(description='equipment')
+    def equipment_link(self, obj):
+        url = reverse('admin:equipment_equipment_changelist')
+        return format_html('<a href="{}?dataset={}">View rows</a>', url, obj.id)
+
 @admin.register(Equipment)
 class EquipmentAdmin(admin.ModelAdmin):
     list_display = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature', 'uploaded_at']
-    list_filter = ['equipment_type', 'uploaded_at']
+    list_filter = [DatasetScopeFilter, EquipmentTypeFilter, 'uploaded_at']
     search_fields = ['equipment_name', 'equipment_type']
+    search_help_text = "Name prefix or exact type (case-sensitive)"
+    # Rows of a dataset share uploaded_at, so pk order matches upload order and walks the index
+    ordering = ['-id']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    raw_id_fields = ['dataset']
+
+    def get_search_results(self, request, queryset, search_term):
+        """Index-friendly search: name prefix as a range scan, type as exact match"""
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        name_prefix = Q(equipment_name__gte=term, equipment_name__lt=term + '\uffff')
+        return queryset.filter(name_prefix | Q(equipment_type=term)), False
+
+@admin.register(EquipmentRollup)
+class EquipmentRollupAdmin(admin.ModelAdmin):
+    list_display = ['equipment_type', 'bucket_start', 'bucket_seconds', 'count']
+    list_filter = ['bucket_seconds', 'bucket_start']
+    search_fields = ['=equipment_type']
+    exclude = ['sketches']
+
+@admin.register(ValidationReport)
+class ValidationReportAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'created_at', 'rows_checked', 'rows_rejected', 'error_count']
+    exclude = ['report']
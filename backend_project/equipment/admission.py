@@ -0,0 +1,292 @@
+"""
+Per-user admission control for heavy endpoints.
+
+Each gated endpoint limits every user's request rate and concurrent
+requests across all workers, through counters in the cache named by
+EQUIPMENT_ADMISSION_CACHE. That cache must be shared by the workers (Redis,
+Memcached); with a per-process cache such as the default LocMemCache each
+worker enforces the limits on its own.
+
+The rate limit is `burst` requests per window of burst / rate seconds (so
+`rate_per_minute` on average). A user already running
+max_concurrent_per_user requests elsewhere gets an immediate 429 rather
+than holding this worker while it waits.
+
+Concurrency slots (max_concurrent) and the wait queue stay per worker
+process: requests that find no free slot wait in a queue that hands freed
+slots round-robin across users. Only concurrent threads of the same process
+ever queue, holding their thread for up to queue_timeout. Requests that
+exceed the rate, find the queue full or wait too long get a 429.
+"""
+import math
+import os
+import time
+import threading
+from collections import OrderedDict, deque
+from functools import wraps
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+DEFAULT_LIMITS = {
+    'rate_per_minute': 30,
+    'burst': 5,
+    'max_concurrent': 2,
+    'max_concurrent_per_user': 1,
+    'max_queue': 20,
+    'queue_timeout': 15,
+}
+
+# A per-user slot count left behind by a killed worker expires after this many seconds
+SLOT_TTL = 600
+
+# How often queued requests recheck per-user slots freed by other workers
+SHARED_POLL_SECONDS = 0.25
+
+
+def _shared_cache():
+    return caches[getattr(settings, 'EQUIPMENT_ADMISSION_CACHE', 'default')]
+
+
+def _incr(key, timeout):
+    """Add one to a shared counter that expires `timeout` seconds after it is created"""
+    cache = _shared_cache()
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Expired between add and incr
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def _decr(key):
+    try:
+        _shared_cache().decr(key)
+    except ValueError:
+        # Expired: nothing left to give back
+        pass
+
+
+class Ticket:
+    __slots__ = ['user_key', 'granted', 'enqueued']
+
+    def __init__(self, user_key):
+        self.user_key = user_key
+        self.granted = False
+        self.enqueued = time.monotonic()
+
+
+class Rejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class EndpointGate:
+    """Shared per-user limits plus this worker's concurrency slots and fair wait queue for one endpoint"""
+
+    def __init__(self, name, limits):
+        self.name = name
+        self.limits = limits
+        self.cond = threading.Condition()
+        self.active = 0
+        self.active_per_user = {}
+        self.waiting = OrderedDict()
+        self.waiting_count = 0
+        self.metrics = {
+            'admitted': 0,
+            'queued': 0,
+            'rejected_rate': 0,
+            'rejected_user_busy': 0,
+            'rejected_queue_full': 0,
+            'rejected_timeout': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+        }
+
+    def _slot_key(self, user_key):
+        return f'admission:{self.name}:active:{user_key}'
+
+    def _check_rate(self, user_key):
+        """Count a request in the user's current rate window, or raise Rejected"""
+        rate = self.limits['rate_per_minute'] / 60
+        if not rate:
+            raise Rejected('rate limit exceeded', float('inf'))
+        window = self.limits['burst'] / rate
+        # Wall-clock windows line up across worker processes
+        now = time.time()
+        key = f'admission:{self.name}:rate:{user_key}:{int(now // window)}'
+        if _incr(key, math.ceil(window) + 1) > self.limits['burst']:
+            self.metrics['rejected_rate'] += 1
+            raise Rejected('rate limit exceeded', window - now % window)
+
+    def _user_busy(self, user_key):
+        """Whether the user runs max_concurrent_per_user requests across all workers"""
+        return _shared_cache().get(self._slot_key(user_key), 0) >= self.limits['max_concurrent_per_user']
+
+    def _take_user_slot(self, user_key):
+        """Count a request against the user's cap across all workers, unless it is reached"""
+        key = self._slot_key(user_key)
+        if _incr(key, SLOT_TTL) > self.limits['max_concurrent_per_user']:
+            _decr(key)
+            return False
+        return True
+
+    def _grant(self, ticket):
+        ticket.granted = True
+        self.active += 1
+        self.active_per_user[ticket.user_key] = self.active_per_user.get(ticket.user_key, 0) + 1
+
+    def _dispatch(self):
+        """Hand free slots to waiting users in round-robin order"""
+        granted = False
+        while self.active < self.limits['max_concurrent'] and self.waiting:
+            user_key = next((key for key in self.waiting if self._take_user_slot(key)), None)
+            if user_key is None:
+                break
+            queue = self.waiting.pop(user_key)
+            self._grant(queue.popleft())
+            self.waiting_count -= 1
+            if queue:
+                # Back of the line for this user's next request
+                self.waiting[user_key] = queue
+            granted = True
+        if granted:
+            self.cond.notify_all()
+
+    def acquire(self, user_key):
+        """Block until a slot is granted, or raise Rejected"""
+        with self.cond:
+            self._check_rate(user_key)
+
+            ticket = Ticket(user_key)
+            if not self.waiting and self.active < self.limits['max_concurrent'] and self._take_user_slot(user_key):
+                self._grant(ticket)
+                self.metrics['admitted'] += 1
+                return
+
+            # Slots held in other workers can't be handed over here, so don't hold this one waiting
+            if not self.active_per_user.get(user_key) and self._user_busy(user_key):
+                self.metrics['rejected_user_busy'] += 1
+                raise Rejected('too many concurrent requests', 1)
+
+            if self.waiting_count >= self.limits['max_queue']:
+                self.metrics['rejected_queue_full'] += 1
+                raise Rejected('queue full', self.limits['queue_timeout'])
+
+            self.waiting.setdefault(user_key, deque()).append(ticket)
+            self.waiting_count += 1
+            self.metrics['queued'] += 1
+            self._dispatch()
+
+            deadline = ticket.enqueued + self.limits['queue_timeout']
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.cond.wait(min(remaining, SHARED_POLL_SECONDS))
+                if not ticket.granted:
+                    self._dispatch()
+
+            if not ticket.granted:
+                queue = self.waiting.get(user_key)
+                queue.remove(ticket)
+                self.waiting_count -= 1
+                if not queue:
+                    del self.waiting[user_key]
+                self.metrics['rejected_timeout'] += 1
+                raise Rejected('timed out waiting for a free slot', self.limits['queue_timeout'])
+
+            waited = time.monotonic() - ticket.enqueued
+            self.metrics['admitted'] += 1
+            self.metrics['total_wait_seconds'] += waited
+            self.metrics['max_wait_seconds'] = max(self.metrics['max_wait_seconds'], waited)
+
+    def release(self, user_key):
+        with self.cond:
+            self.active -= 1
+            count = self.active_per_user.get(user_key, 1) - 1
+            if count:
+                self.active_per_user[user_key] = count
+            else:
+                self.active_per_user.pop(user_key, None)
+            _decr(self._slot_key(user_key))
+            self._dispatch()
+
+    def snapshot(self):
+        with self.cond:
+            return {
+                'limits': self.limits,
+                'active': self.active,
+                'waiting': self.waiting_count,
+                'waiting_users': len(self.waiting),
+                **self.metrics,
+            }
+
+
+_gates = {}
+_gates_lock = threading.Lock()
+
+
+def get_gate(endpoint):
+    """Gate for an endpoint, configured from EQUIPMENT_ADMISSION[endpoint]"""
+    with _gates_lock:
+        gate = _gates.get(endpoint)
+        if gate is None:
+            overrides = getattr(settings, 'EQUIPMENT_ADMISSION', {}).get(endpoint, {})
+            gate = EndpointGate(endpoint, {**DEFAULT_LIMITS, **overrides})
+            _gates[endpoint] = gate
+        return gate
+
+
+def user_key_for(request):
+    """Identify the caller by DRF token, then session user, then client address"""
+    from .tenancy import request_user
+    user = request_user(request)
+    if user is not None:
+        return f"user:{user.pk}"
+    return f"ip:{request.META.get('REMOTE_ADDR', 'unknown')}"
+
+
+def admission_controlled(endpoint):
+    """Decorator that admits a view's requests through the endpoint's gate"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not getattr(settings, 'EQUIPMENT_ADMISSION_ENABLED', True):
+                return view(request, *args, **kwargs)
+
+            from .tenancy import TenantError
+            gate = get_gate(endpoint)
+            try:
+                user_key = user_key_for(request)
+            except TenantError as e:
+                return JsonResponse({"error": str(e)}, status=e.status)
+            try:
+                gate.acquire(user_key)
+            except Rejected as e:
+                retry_after = max(1, int(e.retry_after + 0.999))
+                response = JsonResponse(
+                    {"error": f"Too many requests: {e.reason}", "retry_after": retry_after},
+                    status=429
+                )
+                response['Retry-After'] = str(retry_after)
+                return response
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                gate.release(user_key)
+        return wrapped
+    return decorator
+
+
+def admission_metrics():
+    """Slot, queue and rejection counters of the gates in this worker process"""
+    with _gates_lock:
+        gates = list(_gates.values())
+    return {
+        'pid': os.getpid(),
+        'endpoints': {gate.name: gate.snapshot() for gate in gates},
+    }
@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class EquipmentConfig(AppConfig):
     name = 'equipment'
+
+    def ready(self):
+        if getattr(settings, 'EQUIPMENT_PRELOAD_HEAVY_MODULES', False):
+            from .preload import preload_heavy_modules
+            preload_heavy_modules()
@@ -0,0 +1,167 @@
+"""
+Per-request memory and row budgets for uploads, summaries and reports.
+
+Memory is the growth of the worker's resident set size since the request
+started, sampled from /proc (peak RSS from getrusage where /proc is
+missing; without either only the row budget applies). With EQUIPMENT_MEMORY_TRACEMALLOC enabled, Python allocations
+traced by tracemalloc are used instead: more precise, but it slows every
+allocation, so it is meant for debugging. Both are process-wide, so
+concurrent requests in one worker count against each other's budgets and
+switch to chunked processing early rather than late. The first request in
+a worker also pays for importing pandas (see EQUIPMENT_PRELOAD_HEAVY_MODULES).
+
+Before loading data, a view estimates what the in-memory path needs. If
+that doesn't fit the headroom left under the soft limit, it processes in
+chunks sized to the headroom instead, spooling anything that grows with
+the input (validation error reports) to a temporary file. A budget that
+can't be met ends the request with a clear error: 413 for rows, 503 for
+memory.
+"""
+import os
+import sys
+import tracemalloc
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+from functools import wraps
+from django.conf import settings
+from django.http import JsonResponse
+
+DEFAULT_BUDGET = {
+    'max_memory_mb': 512,
+    'max_rows': 5_000_000,
+}
+
+# Paths switch to chunked processing once usage plus the estimate passes this share
+SOFT_LIMIT = 0.8
+
+# Peak bytes per input byte / per row of the in-memory paths, measured with tracemalloc
+CSV_BYTES_FACTOR = 6
+FRAME_ROW_BYTES = 500
+
+MIN_CHUNK_ROWS = 1_000
+MAX_CHUNK_ROWS = 250_000
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        if resource is None:
+            return 0
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Kilobytes on Linux, bytes on macOS
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _sample():
+    if getattr(settings, 'EQUIPMENT_MEMORY_TRACEMALLOC', False):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        return tracemalloc.get_traced_memory()[0]
+    return _rss_bytes()
+
+
+class BudgetExceeded(Exception):
+    """A request's row or memory budget can't be met"""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class MemoryBudget:
+    """Memory and row allowance for one request"""
+
+    def __init__(self, name, max_memory_mb, max_rows):
+        self.name = name
+        self.max_bytes = int(max_memory_mb * 1024 * 1024) if max_memory_mb else None
+        self.max_rows = max_rows
+        self.baseline = _sample()
+        self.peak = 0
+        self.mode = 'in-memory'
+
+    def used(self):
+        used = max(0, _sample() - self.baseline)
+        self.peak = max(self.peak, used)
+        return used
+
+    def headroom(self):
+        """Bytes left under the soft limit"""
+        if self.max_bytes is None:
+            return float('inf')
+        return self.max_bytes * SOFT_LIMIT - self.used()
+
+    def fits(self, estimated_bytes):
+        """Whether an in-memory pass needing `estimated_bytes` stays under the soft limit"""
+        return estimated_bytes <= self.headroom()
+
+    def chunk_rows(self, row_bytes=FRAME_ROW_BYTES, default=MAX_CHUNK_ROWS, in_flight=1):
+        """Rows per chunk so that `in_flight` chunks together use at most a quarter of the headroom"""
+        self.mode = 'chunked'
+        headroom = self.headroom()
+        if headroom == float('inf'):
+            return default
+        rows = int(headroom / 4 / in_flight / row_bytes)
+        if rows < MIN_CHUNK_ROWS:
+            self.check('starting chunked processing', hard=False)
+            rows = MIN_CHUNK_ROWS
+        return min(rows, default)
+
+    def check_rows(self, rows, advice=""):
+        if self.max_rows is not None and rows > self.max_rows:
+            message = f"{rows} rows exceeds the {self.name} budget of {self.max_rows} rows"
+            raise BudgetExceeded(f"{message}. {advice}".strip(), status=413)
+
+    def check(self, stage, hard=True):
+        """Fail once usage passes the budget (or the soft limit when hard=False)"""
+        if self.max_bytes is None:
+            return
+        limit = self.max_bytes if hard else self.max_bytes * SOFT_LIMIT
+        used = self.used()
+        if used > limit:
+            raise BudgetExceeded(
+                f"The {self.name} memory budget of {self.max_bytes // (1024 * 1024)} MB was exceeded "
+                f"while {stage} ({used // (1024 * 1024)} MB in use). Try again later or with less data.",
+                status=503
+            )
+
+    def describe(self):
+        return {
+            'mode': self.mode,
+            'peak_mb': round(self.peak / (1024 * 1024), 1),
+            'max_memory_mb': self.max_bytes // (1024 * 1024) if self.max_bytes else None,
+            'max_rows': self.max_rows,
+        }
+
+
+def checked_chunks(chunks, budget, stage):
+    """Pass chunks through, checking the memory budget after each one"""
+    for chunk in chunks:
+        yield chunk
+        budget.check(stage)
+
+
+def get_budget(name):
+    """Budget for an endpoint from EQUIPMENT_MEMORY_BUDGETS (falls back to 'default')"""
+    budgets = getattr(settings, 'EQUIPMENT_MEMORY_BUDGETS', {})
+    config = {**DEFAULT_BUDGET, **budgets.get('default', {}), **budgets.get(name, {})}
+    return MemoryBudget(name, config['max_memory_mb'], config['max_rows'])
+
+
+def memory_budgeted(name):
+    """Decorator that gives a view `request.memory_budget` and turns BudgetExceeded into JSON errors"""
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            request.memory_budget = get_budget(name)
+            try:
+                return view(request, *args, **kwargs)
+            except BudgetExceeded as e:
+                return JsonResponse({"error": str(e)}, status=e.status)
+        return wrapped
+    return decorator
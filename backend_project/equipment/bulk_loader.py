@@ -0,0 +1,114 @@
+import io
+import csv
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Equipment
+
+# Columns written by the loader, in insert order
+LOAD_FIELDS = ['dataset', 'tenant', 'equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature', 'uploaded_at']
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def get_batch_size():
+    """Rows per executemany batch, configurable via EQUIPMENT_BULK_LOAD_BATCH_SIZE"""
+    return int(getattr(settings, 'EQUIPMENT_BULK_LOAD_BATCH_SIZE', DEFAULT_BATCH_SIZE))
+
+
+def _table_and_columns():
+    """Quoted table name and column names for the Equipment table"""
+    qn = connection.ops.quote_name
+    meta = Equipment._meta
+    columns = [qn(meta.get_field(name).column) for name in LOAD_FIELDS]
+    return qn(meta.db_table), columns
+
+
+def _iter_rows(dataset, columns, uploaded_at):
+    """Yield insert tuples straight from the column arrays"""
+    return zip(
+        [dataset.id] * len(columns['equipment_name']),
+        [dataset.tenant] * len(columns['equipment_name']),
+        columns['equipment_name'],
+        columns['equipment_type'],
+        columns['flowrate'],
+        columns['pressure'],
+        columns['temperature'],
+        [uploaded_at] * len(columns['equipment_name']),
+    )
+
+
+def _load_executemany(cursor, table, column_names, rows, batch_size):
+    """Insert rows in fixed-size executemany batches"""
+    placeholders = ', '.join(['%s'] * len(column_names))
+    sql = f"INSERT INTO {table} ({', '.join(column_names)}) VALUES ({placeholders})"
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+
+
+def _load_copy(cursor, table, column_names, rows, batch_size):
+    """Stream rows into PostgreSQL with COPY ... FROM STDIN"""
+    sql = f"COPY {table} ({', '.join(column_names)}) FROM STDIN"
+    raw_cursor = cursor.cursor
+
+    if hasattr(raw_cursor, 'copy_expert'):
+        # psycopg2: buffer a batch as CSV, then hand it to copy_expert
+        sql += " WITH (FORMAT csv)"
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if count % batch_size == 0:
+                buffer.seek(0)
+                raw_cursor.copy_expert(sql, buffer)
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+        if buffer.tell():
+            buffer.seek(0)
+            raw_cursor.copy_expert(sql, buffer)
+    else:
+        # psycopg 3: rows are written straight into the COPY stream
+        with raw_cursor.copy(sql) as copy:
+            for row in rows:
+                copy.write_row(row)
+
+
+def bulk_load_equipment(dataset, columns, batch_size=None):
+    """
+    Insert equipment rows from column arrays without building model instances.
+
+    `columns` maps equipment_name, equipment_type, flowrate, pressure and
+    temperature to equal-length sequences. Uses COPY on PostgreSQL and batched
+    executemany everywhere else, all inside a single transaction. Returns the
+    number of rows written.
+    """
+    batch_size = batch_size or get_batch_size()
+    total = len(columns['equipment_name'])
+    if total == 0:
+        return 0
+
+    # auto_now_add is evaluated once for the whole load instead of per row
+    uploaded_at = timezone.now()
+    if not settings.USE_TZ:
+        uploaded_at = timezone.make_naive(uploaded_at)
+    uploaded_at = connection.ops.adapt_datetimefield_value(uploaded_at)
+
+    table, column_names = _table_and_columns()
+    rows = _iter_rows(dataset, columns, uploaded_at)
+
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                _load_copy(cursor, table, column_names, rows, batch_size)
+            else:
+                _load_executemany(cursor, table, column_names, rows, batch_size)
+
+    return total
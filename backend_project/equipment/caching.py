@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+from .models import Dataset, Equipment
+
+EQUIPMENT_TYPES_CACHE_KEY = 'equipment:types'
+EQUIPMENT_TYPES_CACHE_TIMEOUT = 300
+SUMMARY_CACHE_TIMEOUT = 300
+
+
+def get_equipment_types():
+    """Distinct equipment types, cached so filters don't rescan the table"""
+    types = cache.get(EQUIPMENT_TYPES_CACHE_KEY)
+    if types is None:
+        types = list(
+            Equipment.objects.order_by('equipment_type')
+            .values_list('equipment_type', flat=True)
+            .distinct()
+        )
+        cache.set(EQUIPMENT_TYPES_CACHE_KEY, types, EQUIPMENT_TYPES_CACHE_TIMEOUT)
+    return types
+
+
+def invalidate_equipment_types():
+    """Drop cached equipment types after data changes"""
+    cache.delete(EQUIPMENT_TYPES_CACHE_KEY)
+
+
+def _tenant_data_state(tenant):
+    """
+    What a tenant's summaries depend on, read from the Dataset table.
+
+    Uploads add a dataset, live batches grow total_records and compaction
+    deletes datasets, so any change to the tenant's data changes this tuple.
+    """
+    state = Dataset.objects.filter(tenant=tenant).aggregate(
+        datasets=Count('id'), latest=Max('id'), rows=Sum('total_records')
+    )
+    return f"{state['datasets']}-{state['latest']}-{state['rows']}"
+
+
+def get_tenant_summary(tenant, scope, compute):
+    """
+    Cached summary for one tenant and scope (a dataset id or "all").
+
+    The key includes the tenant's current data state read from the database,
+    so a change made through any worker is seen by every worker, even with a
+    per-process cache backend, and one tenant's changes never evict another's.
+    """
+    key = f'equipment:summary:{tenant}:{_tenant_data_state(tenant)}:{scope}'
+    summary = cache.get(key)
+    if summary is None:
+        summary = compute()
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    return summary
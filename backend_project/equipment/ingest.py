@@ -0,0 +1,45 @@
+import pandas as pd
+from .bulk_loader import bulk_load_equipment
+from .budgets import FRAME_ROW_BYTES
+from .data_analysis import parse_csv_to_equipment_columns
+from .parallel_stats import ChunkAggregate, csv_file_path, get_workers, validate_csv_chunk, validate_csv_file
+from .validation import SpooledValidationResult, get_rules
+
+
+def ingest_csv_chunked(csv_file, dataset, budget):
+    """
+    Validate, store and aggregate an uploaded CSV one chunk at a time.
+
+    Uploads spooled to disk are parsed and validated by pool workers, one
+    byte range each, while this process writes the accepted rows; uploads
+    held in memory are read here. Chunks are sized so that the 2 * workers
+    chunks in flight fit the request's memory budget. Returns (ChunkAggregate
+    of accepted rows, SpooledValidationResult). Run it in a transaction: a
+    budget failure part way through raises BudgetExceeded after earlier
+    chunks were written.
+    """
+    validation = SpooledValidationResult()
+    total = ChunkAggregate()
+
+    path = csv_file_path(csv_file)
+    workers = get_workers() if path else 1
+    chunk_rows = budget.chunk_rows(FRAME_ROW_BYTES, in_flight=2 * workers)
+    if path and workers > 1:
+        results = validate_csv_file(path, workers, chunk_rows)
+    else:
+        rules = get_rules()
+        chunks = pd.read_csv(csv_file, chunksize=chunk_rows, skip_blank_lines=False)
+        results = (validate_csv_chunk(chunk, rules) for chunk in chunks)
+
+    lines = 0
+    for result, partial, chunk_lines in results:
+        budget.check_rows(validation.rows_checked + result.rows_checked, "Split the file into smaller uploads.")
+        # Chunk-relative report rows become CSV line numbers
+        result.errors['row'] += lines
+        lines += chunk_lines
+        validation.add(result)
+        if len(result.clean):
+            bulk_load_equipment(dataset, parse_csv_to_equipment_columns(result.clean))
+            total.merge(partial)
+        budget.check("loading CSV chunks")
+    return total, validation
@@ -0,0 +1,116 @@
+import json
+import math
+from django.db import transaction
+from .models import Dataset
+from .bulk_loader import bulk_load_equipment
+from .caching import invalidate_equipment_types
+from .running_stats import RunningStats, NUMERIC_FIELDS
+
+# Accepted keys for each reading; CSV header names work too
+READING_ALIASES = {
+    'equipment_name': ['equipment_name', 'Equipment Name'],
+    'equipment_type': ['equipment_type', 'Type'],
+    'flowrate': ['flowrate', 'Flowrate'],
+    'pressure': ['pressure', 'Pressure'],
+    'temperature': ['temperature', 'Temperature'],
+}
+
+
+def parse_ndjson_readings(body):
+    """
+    Parse an NDJSON body into column arrays.
+
+    Returns (columns, line_numbers, error). Blank lines are skipped; the
+    first bad line is reported by its 1-based line number.
+    """
+    columns = {key: [] for key in READING_ALIASES}
+    line_numbers = []
+    for line_no, line in enumerate(body.decode('utf-8').splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            reading = json.loads(line)
+        except json.JSONDecodeError as e:
+            return None, None, f"Line {line_no}: invalid JSON ({e.msg})"
+        if not isinstance(reading, dict):
+            return None, None, f"Line {line_no}: expected a JSON object"
+
+        for key, aliases in READING_ALIASES.items():
+            value = next((reading[a] for a in aliases if a in reading), None)
+            if value is None:
+                return None, None, f"Line {line_no}: missing '{key}'"
+            if key in NUMERIC_FIELDS:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    return None, None, f"Line {line_no}: '{key}' must be a number"
+                if not math.isfinite(value):
+                    return None, None, f"Line {line_no}: '{key}' must be a finite number"
+            else:
+                value = str(value)
+            columns[key].append(value)
+        line_numbers.append(line_no)
+    return columns, line_numbers, None
+
+
+def validate_readings(columns, line_numbers):
+    """
+    Apply the upload validation rules to parsed readings.
+
+    Returns (columns, error). A batch with any rejected reading is refused as
+    a whole, reporting the first failure by its NDJSON line number.
+    """
+    import pandas as pd
+    from .validation import resolve_headers, validate_frame
+
+    df = pd.DataFrame(columns)
+    rename, missing = resolve_headers(df.columns)
+    if missing:
+        return None, f"Readings lack required columns: {', '.join(missing)}"
+    validation = validate_frame(df.rename(columns=rename))
+    if validation.error_count:
+        first = validation.errors.iloc[0]
+        line_no = line_numbers[int(first['row']) - 2]
+        return None, f"Line {line_no}: '{first['column']}' {first['error']} ({first['value']})"
+    clean = validation.clean
+    return {key: clean[rename.get(key, key)].tolist() for key in READING_ALIASES}, None
+
+
+def open_live_dataset(filename, tenant, owner=None):
+    """Create a dataset that accepts streamed readings"""
+    return Dataset.objects.create(filename=filename, tenant=tenant, owner=owner, is_live=True,
+                                  live_stats=RunningStats().to_dict())
+
+
+def append_readings(dataset_id, columns):
+    """
+    Write a batch of readings for a live dataset and fold them into its
+    running stats. Returns rows written; raises Dataset.DoesNotExist once
+    the dataset is closed.
+
+    Each batch is written straight through in one transaction, so nothing
+    is held in worker memory between requests and any worker can append to
+    or close any live dataset.
+    """
+    if not columns['equipment_name']:
+        return 0
+
+    with transaction.atomic():
+        dataset = Dataset.objects.select_for_update().get(id=dataset_id, is_live=True)
+        written = bulk_load_equipment(dataset, columns)
+        stats = RunningStats.from_dict(dataset.live_stats).update(columns)
+        dataset.live_stats = stats.to_dict()
+        dataset.total_records = stats.count
+        dataset.save(update_fields=['live_stats', 'total_records'])
+
+    invalidate_equipment_types()
+    return written
+
+
+def close_live_dataset(dataset):
+    """Stop accepting new readings, after any batch that is being written"""
+    with transaction.atomic():
+        dataset = Dataset.objects.select_for_update().get(id=dataset.id)
+        dataset.is_live = False
+        dataset.save(update_fields=['is_live'])
+    return dataset
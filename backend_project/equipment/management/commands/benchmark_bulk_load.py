@@ -0,0 +1,61 @@
+import time
+import random
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from equipment.models import Equipment, Dataset
+from equipment.bulk_loader import bulk_load_equipment
+
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+class Command(BaseCommand):
+    help = "Compare bulk_create against the column bulk loader (changes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--skip-orm', action='store_true', help="Only time the bulk loader")
+
+    def make_columns(self, rows):
+        rng = random.Random(42)
+        return {
+            'equipment_name': [f"Equipment-{i}" for i in range(rows)],
+            'equipment_type': [rng.choice(EQUIPMENT_TYPES) for _ in range(rows)],
+            'flowrate': [rng.uniform(50, 250) for _ in range(rows)],
+            'pressure': [rng.uniform(2, 15) for _ in range(rows)],
+            'temperature': [rng.uniform(80, 150) for _ in range(rows)],
+        }
+
+    def time_orm(self, columns):
+        with transaction.atomic():
+            dataset = Dataset.objects.create(filename='benchmark.csv')
+            start = time.perf_counter()
+            Equipment.objects.bulk_create([
+                Equipment(dataset=dataset, **dict(zip(columns.keys(), values)))
+                for values in zip(*columns.values())
+            ])
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed
+
+    def time_loader(self, columns, batch_size):
+        with transaction.atomic():
+            dataset = Dataset.objects.create(filename='benchmark.csv')
+            start = time.perf_counter()
+            bulk_load_equipment(dataset, columns, batch_size=batch_size)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        return elapsed
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        columns = self.make_columns(rows)
+        self.stdout.write(f"Loading {rows} rows")
+
+        loader_time = self.time_loader(columns, options['batch_size'])
+        self.stdout.write(f"bulk_load_equipment: {loader_time:.2f}s ({rows / loader_time:,.0f} rows/s)")
+
+        if not options['skip_orm']:
+            orm_time = self.time_orm(columns)
+            self.stdout.write(f"bulk_create:         {orm_time:.2f}s ({rows / orm_time:,.0f} rows/s)")
+            self.stdout.write(self.style.SUCCESS(f"Speedup: {orm_time / loader_time:.1f}x"))
@@ -0,0 +1,66 @@
+import os
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from equipment.data_analysis import analyze_equipment_frame
+from equipment.parallel_stats import analyze_csv_parallel
+from equipment.validation import validate_equipment_csv
+
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+class Command(BaseCommand):
+    help = "Compare pandas statistics with the parallel chunked engine across worker counts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=5_000_000)
+        parser.add_argument('--workers', default='1,2,4,8', help="Comma-separated worker counts")
+        parser.add_argument('--chunk-rows', type=int, default=None)
+        parser.add_argument('--skip-pandas', action='store_true', help="Skip the single-DataFrame baseline")
+
+    def write_csv(self, path, rows):
+        rng = np.random.default_rng(42)
+        pd.DataFrame({
+            'Equipment Name': [f"Equipment-{i}" for i in range(rows)],
+            'Type': rng.choice(EQUIPMENT_TYPES, rows),
+            'Flowrate': rng.uniform(50, 250, rows),
+            'Pressure': rng.uniform(2, 15, rows),
+            'Temperature': rng.normal(115, 15, rows),
+        }).to_csv(path, index=False)
+
+    def max_deviation(self, expected, actual):
+        """Largest difference between matching statistics, relative to the value range"""
+        worst = 0.0
+        for field, stats in expected['statistics'].items():
+            value_range = (stats['max'] - stats['min']) or 1
+            for key, value in stats.items():
+                worst = max(worst, abs(value - actual['statistics'][field][key]) / value_range)
+        return worst
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'benchmark.csv')
+            self.write_csv(path, options['rows'])
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            self.stdout.write(f"{options['rows']} rows, {size_mb:.0f} MB")
+
+            baseline = None
+            if not options['skip_pandas']:
+                start = time.perf_counter()
+                # The exact path uploads take when they fit their memory budget
+                validation, _ = validate_equipment_csv(path)
+                baseline = analyze_equipment_frame(validation.clean)
+                pandas_time = time.perf_counter() - start
+                self.stdout.write(f"pandas:     {pandas_time:.2f}s")
+
+            for workers in [int(w) for w in options['workers'].split(',')]:
+                start = time.perf_counter()
+                with open(path) as f:
+                    summary, error = analyze_csv_parallel(f, workers=workers, chunk_rows=options['chunk_rows'])
+                elapsed = time.perf_counter() - start
+                line = f"workers={workers}: {elapsed:.2f}s"
+                if baseline:
+                    line += f" ({pandas_time / elapsed:.1f}x, max deviation {self.max_deviation(baseline, summary):.2e} of range)"
+                self.stdout.write(line)
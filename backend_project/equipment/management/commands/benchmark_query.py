@@ -0,0 +1,69 @@
+import time
+import random
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from equipment import queries
+from equipment.models import Dataset
+from equipment.bulk_loader import bulk_load_equipment
+
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+
+QUERIES = {
+    'avg pressure by type': {
+        'group_by': ['equipment_type'],
+        'aggregates': [{'fn': 'avg', 'field': 'pressure'}, {'fn': 'count'}],
+    },
+    'filtered by risk': {
+        'filters': [{'field': 'temperature', 'op': 'gt', 'value': 120}],
+        'group_by': ['risk'],
+        'aggregates': [{'fn': 'max', 'field': 'flowrate'}],
+    },
+    'std by type': {
+        'group_by': ['equipment_type'],
+        'aggregates': [{'fn': 'std', 'field': 'temperature'}],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = "Time each query engine on a generated dataset (changes are rolled back)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500_000)
+
+    def make_columns(self, rows):
+        rng = random.Random(42)
+        return {
+            'equipment_name': [f"Equipment-{i}" for i in range(rows)],
+            'equipment_type': [rng.choice(EQUIPMENT_TYPES) for _ in range(rows)],
+            'flowrate': [rng.uniform(50, 250) for _ in range(rows)],
+            'pressure': [rng.uniform(2, 15) for _ in range(rows)],
+            'temperature': [rng.uniform(80, 150) for _ in range(rows)],
+        }
+
+    def time_query(self, spec, engine):
+        start = time.perf_counter()
+        queries.execute_query('benchmark', {**spec, 'engine': engine})
+        return time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        with transaction.atomic():
+            dataset = Dataset.objects.create(filename='benchmark.csv', tenant='benchmark', total_records=rows)
+            bulk_load_equipment(dataset, self.make_columns(rows))
+            self.stdout.write(f"Querying {rows} rows (ms per 100k rows)")
+
+            for name, spec in QUERIES.items():
+                queries._frames.pop(dataset.id, None)
+                timings = {
+                    'sql': self.time_query(spec, 'sql'),
+                    'columnar (load)': self.time_query(spec, 'columnar'),
+                    'columnar (cached)': self.time_query(spec, 'columnar'),
+                }
+                cells = ', '.join(f"{engine} {elapsed * 1000 * 100_000 / rows:.1f}" for engine, elapsed in timings.items())
+                self.stdout.write(f"{name}: {cells}")
+                plan = queries.execute_query('benchmark', spec)['plan']
+                self.stdout.write(f"  planner picks {plan['engine']} ({plan['reason']})")
+
+            queries._frames.pop(dataset.id, None)
+            transaction.set_rollback(True)
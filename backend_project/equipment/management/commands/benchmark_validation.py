@@ -0,0 +1,49 @@
+import io
+import time
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+from equipment.validation import resolve_headers, validate_frame
+
+EQUIPMENT_TYPES = ['Pump', 'Compressor', 'Valve', 'HeatExchanger', 'Reactor', 'Condenser']
+
+
+class Command(BaseCommand):
+    help = "Compare CSV parsing time with validation time"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--bad-fraction', type=float, default=0.01, help="Share of rows with a bad value")
+
+    def make_csv(self, rows, bad_fraction):
+        rng = np.random.default_rng(42)
+        flowrate = rng.uniform(50, 250, rows).round(2).astype(object)
+        bad = rng.random(rows) < bad_fraction
+        flowrate[bad] = 'n/a'
+        buffer = io.StringIO()
+        pd.DataFrame({
+            'Equipment Name': [f"Equipment-{i}" for i in range(rows)],
+            'Type': rng.choice(EQUIPMENT_TYPES, rows),
+            'Flowrate': flowrate,
+            'Pressure': rng.uniform(2, 15, rows).round(2),
+            'Temperature': rng.uniform(80, 150, rows).round(2),
+        }).to_csv(buffer, index=False)
+        buffer.seek(0)
+        return buffer
+
+    def handle(self, *args, **options):
+        buffer = self.make_csv(options['rows'], options['bad_fraction'])
+
+        start = time.perf_counter()
+        df = pd.read_csv(buffer)
+        parse_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rename, _ = resolve_headers(df.columns)
+        result = validate_frame(df.rename(columns=rename))
+        validate_time = time.perf_counter() - start
+
+        rows = options['rows']
+        self.stdout.write(f"parse:    {parse_time:.2f}s ({rows / parse_time:,.0f} rows/s)")
+        self.stdout.write(f"validate: {validate_time:.2f}s ({rows / validate_time:,.0f} rows/s)")
+        self.stdout.write(f"{result.rows_rejected} rows rejected, {result.error_count} errors")
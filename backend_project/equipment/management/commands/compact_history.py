@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from equipment.rollups import compact_old_datasets
+from equipment.caching import invalidate_equipment_types
+from equipment.models import Dataset
+from equipment.tenancy import enforce_retention
+
+
+class Command(BaseCommand):
+    help = "Compact each tenant's datasets beyond its EQUIPMENT_TENANT_QUOTAS retention into per-type, per-time-bucket rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, default=None,
+                            help="Keep exactly this many newest datasets raw per tenant, overriding the quotas")
+        parser.add_argument('--tenant', help="Only compact this tenant (e.g. user:3, team:2, public)")
+
+    def handle(self, *args, **options):
+        if options['keep'] is not None:
+            compacted = compact_old_datasets(keep=options['keep'], tenant=options['tenant'])
+        else:
+            tenants = [options['tenant']] if options['tenant'] else list(
+                Dataset.objects.order_by().values_list('tenant', flat=True).distinct()
+            )
+            compacted = sum(enforce_retention(tenant) for tenant in tenants)
+        invalidate_equipment_types()
+        self.stdout.write(self.style.SUCCESS(f"Compacted {compacted} rows into rollups"))
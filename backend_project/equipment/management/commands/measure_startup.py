@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import statistics
+import subprocess
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: set up Django, load the URLconf, report timing
+PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+import django
+django.setup()
+if os.environ.get('EQUIPMENT_PRELOAD_PROBE') == '1':
+    from equipment.preload import preload_heavy_modules
+    preload_heavy_modules()
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    'seconds': elapsed,
+    'heavy': [m for m in ('pandas', 'numpy', 'reportlab') if m in sys.modules],
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Measure cold start (django.setup + URLconf) with lazy imports and with preloading"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+
+    def probe(self, preload):
+        env = dict(os.environ, EQUIPMENT_PRELOAD_PROBE='1' if preload else '0')
+        env.setdefault('DJANGO_SETTINGS_MODULE', os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE], env=env, cwd=settings.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        for label, preload in [('lazy', False), ('preloaded', True)]:
+            results = [self.probe(preload) for _ in range(options['runs'])]
+            median = statistics.median(r['seconds'] for r in results)
+            heavy = ', '.join(results[0]['heavy']) or 'none'
+            self.stdout.write(f"{label:10} {median * 1000:7.0f} ms  (heavy modules loaded: {heavy})")
@@ -0,0 +1,29 @@
+# Generated by Django 6.0.1 on 2026-10-19 07:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0003_dataset_equipment_delete_equipmentrecord'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['equipment_type'], name='equipment_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['equipment_name'], name='equipment_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['uploaded_at'], name='equipment_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['dataset', 'equipment_type'], name='equipment_dataset_type_idx'),
+        ),
+    ]
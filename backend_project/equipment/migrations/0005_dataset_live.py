@@ -0,0 +1,23 @@
+# Generated by Django 6.0.1 on 2026-10-19 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0004_equipment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='dataset',
+            name='is_live',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='live_stats',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
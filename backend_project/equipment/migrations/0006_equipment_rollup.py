@@ -0,0 +1,41 @@
+# Generated by Django 6.0.1 on 2026-10-19 08:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0005_dataset_live'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('equipment_type', models.CharField(max_length=100)),
+                ('bucket_start', models.DateTimeField()),
+                ('bucket_seconds', models.IntegerField()),
+                ('count', models.BigIntegerField(default=0)),
+                ('flowrate_sum', models.FloatField(default=0)),
+                ('flowrate_m2', models.FloatField(default=0)),
+                ('flowrate_min', models.FloatField()),
+                ('flowrate_max', models.FloatField()),
+                ('pressure_sum', models.FloatField(default=0)),
+                ('pressure_m2', models.FloatField(default=0)),
+                ('pressure_min', models.FloatField()),
+                ('pressure_max', models.FloatField()),
+                ('temperature_sum', models.FloatField(default=0)),
+                ('temperature_m2', models.FloatField(default=0)),
+                ('temperature_min', models.FloatField()),
+                ('temperature_max', models.FloatField()),
+                ('sketches', models.JSONField(default=dict)),
+            ],
+            options={
+                'ordering': ['bucket_start', 'equipment_type'],
+                'indexes': [models.Index(fields=['bucket_start'], name='rollup_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('equipment_type', 'bucket_start', 'bucket_seconds'), name='unique_rollup_bucket')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0006_equipment_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ValidationReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('filename', models.CharField(max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('rows_checked', models.IntegerField(default=0)),
+                ('rows_rejected', models.IntegerField(default=0)),
+                ('error_count', models.IntegerField(default=0)),
+                ('report', models.BinaryField()),
+                ('dataset', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='validation_report', to='equipment.dataset')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
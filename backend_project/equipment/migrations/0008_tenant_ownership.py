@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('equipment', '0007_validation_report'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='equipmentrollup',
+            name='unique_rollup_bucket',
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='owner',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='datasets', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='dataset',
+            name='tenant',
+            field=models.CharField(default='public', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='equipment',
+            name='tenant',
+            field=models.CharField(default='public', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='equipmentrollup',
+            name='tenant',
+            field=models.CharField(default='public', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='validationreport',
+            name='tenant',
+            field=models.CharField(default='public', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='dataset',
+            index=models.Index(fields=['tenant', '-uploaded_at'], name='dataset_tenant_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['tenant', 'dataset'], name='equipment_tenant_dataset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['tenant', 'equipment_type'], name='equipment_tenant_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipment',
+            index=models.Index(fields=['tenant', 'uploaded_at'], name='equipment_tenant_uploaded_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='equipmentrollup',
+            index=models.Index(fields=['tenant', 'bucket_start'], name='rollup_tenant_bucket_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='validationreport',
+            index=models.Index(fields=['tenant', '-created_at'], name='report_tenant_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='equipmentrollup',
+            constraint=models.UniqueConstraint(fields=('tenant', 'equipment_type', 'bucket_start', 'bucket_seconds'), name='unique_tenant_rollup_bucket'),
+        ),
+    ]
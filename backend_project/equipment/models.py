@@ -1,13 +1,24 @@
+import gzip
+from django.conf import settings
 from django.db import models
 
 class Dataset(models.Model):
     """Stores metadata about uploaded CSV files"""
+    # "user:<id>", "team:<id>" or "public" (see equipment.tenancy)
+    tenant = models.CharField(max_length=64, default='public')
+    owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, related_name='datasets', null=True, blank=True)
     filename = models.CharField(max_length=255)
     uploaded_at = models.DateTimeField(auto_now_add=True)
     total_records = models.IntegerField(default=0)
+    # Live datasets accept streamed readings and keep running statistics
+    is_live = models.BooleanField(default=False)
+    live_stats = models.JSONField(null=True, blank=True)
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['tenant', '-uploaded_at'], name='dataset_tenant_uploaded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.filename} - {self.uploaded_at.strftime('%Y-%m-%d %H:%M')}"
@@ -15,6 +26,8 @@ class Dataset(models.Model):
 class Equipment(models.Model):
    
     dataset = models.ForeignKey(Dataset, on_delete=models.CASCADE, related_name='equipment', null=True, blank=True)
+    # Copied from the dataset so per-tenant queries don't need a join
+    tenant = models.CharField(max_length=64, default='public')
     equipment_name = models.CharField(max_length=200)
     equipment_type = models.CharField(max_length=100)
     flowrate = models.FloatField()
@@ -24,6 +37,77 @@ class Equipment(models.Model):
     
     class Meta:
         ordering = ['-uploaded_at']
+        indexes = [
+            models.Index(fields=['equipment_type'], name='equipment_type_idx'),
+            models.Index(fields=['equipment_name'], name='equipment_name_idx'),
+            models.Index(fields=['uploaded_at'], name='equipment_uploaded_idx'),
+            models.Index(fields=['dataset', 'equipment_type'], name='equipment_dataset_type_idx'),
+            models.Index(fields=['tenant', 'dataset'], name='equipment_tenant_dataset_idx'),
+            models.Index(fields=['tenant', 'equipment_type'], name='equipment_tenant_type_idx'),
+            models.Index(fields=['tenant', 'uploaded_at'], name='equipment_tenant_uploaded_idx'),
+        ]
     
     def __str__(self):
         return f"{self.equipment_name} ({self.equipment_type})"
+
+class ValidationReport(models.Model):
+    """Per-row validation errors for an upload, stored as gzipped CSV"""
+    dataset = models.OneToOneField(Dataset, on_delete=models.CASCADE, related_name='validation_report', null=True, blank=True)
+    tenant = models.CharField(max_length=64, default='public')
+    filename = models.CharField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+    rows_checked = models.IntegerField(default=0)
+    rows_rejected = models.IntegerField(default=0)
+    error_count = models.IntegerField(default=0)
+    report = models.BinaryField()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['tenant', '-created_at'], name='report_tenant_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} - {self.error_count} errors"
+    
+    def csv_text(self):
+        """Decompressed report as CSV text"""
+        return gzip.decompress(bytes(self.report)).decode('utf-8')
+
+class EquipmentRollup(models.Model):
+    """Per-type, per-time-bucket aggregates of compacted equipment readings"""
+    tenant = models.CharField(max_length=64, default='public')
+    equipment_type = models.CharField(max_length=100)
+    bucket_start = models.DateTimeField()
+    bucket_seconds = models.IntegerField()
+    count = models.BigIntegerField(default=0)
+    flowrate_sum = models.FloatField(default=0)
+    flowrate_m2 = models.FloatField(default=0)
+    flowrate_min = models.FloatField()
+    flowrate_max = models.FloatField()
+    pressure_sum = models.FloatField(default=0)
+    pressure_m2 = models.FloatField(default=0)
+    pressure_min = models.FloatField()
+    pressure_max = models.FloatField()
+    temperature_sum = models.FloatField(default=0)
+    temperature_m2 = models.FloatField(default=0)
+    temperature_min = models.FloatField()
+    temperature_max = models.FloatField()
+    # Serialized TDigest per numeric field, used for medians
+    sketches = models.JSONField(default=dict)
+    
+    class Meta:
+        ordering = ['bucket_start', 'equipment_type']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tenant', 'equipment_type', 'bucket_start', 'bucket_seconds'],
+                name='unique_tenant_rollup_bucket'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['bucket_start'], name='rollup_bucket_idx'),
+            models.Index(fields=['tenant', 'bucket_start'], name='rollup_tenant_bucket_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.equipment_type} @ {self.bucket_start:%Y-%m-%d %H:%M} ({self.count})"
@@ -0,0 +1,362 @@
+"""
+Parallel chunked statistics for large datasets.
+
+Input is split into ranges that pool workers load themselves: byte ranges
+of a CSV file on disk (cut at line breaks) or primary-key ranges of a
+queryset. Each worker parses or queries its range, validates it and
+reduces it to a ChunkAggregate; the parent only computes range boundaries
+and merges partials. CSV uploads held in memory fall back to reading
+chunks in the parent. Results stay within these tolerances of the
+single-DataFrame pandas path:
+
+- count, type and risk distributions, min and max are exact
+- mean and std: relative error below 1e-9 (Chan et al. merge of Welford moments)
+- median: t-digest estimate, within 1% of the value range (usually far less)
+"""
+import io
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import django
+import pandas as pd
+from django.conf import settings
+from django.db import connections
+from .models import Equipment
+from .rollups import Aggregate
+from .running_stats import NUMERIC_FIELDS, RISK_THRESHOLDS
+from .validation import drop_blank_lines, get_rules, resolve_headers, validate_frame
+
+DEFAULT_CHUNK_ROWS = 250_000
+DEFAULT_MIN_ROWS = 1_000_000
+
+# Bytes read from the head of a CSV to estimate its average row size
+ROW_SIZE_SAMPLE_BYTES = 64 * 1024
+
+# CSV header -> field name
+CSV_COLUMNS = {
+    'Type': 'equipment_type',
+    'Flowrate': 'flowrate',
+    'Pressure': 'pressure',
+    'Temperature': 'temperature',
+}
+
+
+def get_workers():
+    """Process pool size, configurable via PARALLEL_STATS_WORKERS"""
+    return int(getattr(settings, 'PARALLEL_STATS_WORKERS', None) or os.cpu_count() or 1)
+
+
+def get_chunk_rows():
+    return int(getattr(settings, 'PARALLEL_STATS_CHUNK_ROWS', DEFAULT_CHUNK_ROWS))
+
+
+def get_min_rows():
+    """Row count from which summaries go through the parallel engine (PARALLEL_STATS_MIN_ROWS)"""
+    return int(getattr(settings, 'PARALLEL_STATS_MIN_ROWS', DEFAULT_MIN_ROWS))
+
+
+class ChunkAggregate(Aggregate):
+    """Aggregate plus type and risk counts"""
+
+    def __init__(self):
+        super().__init__()
+        self.type_counts = {}
+        self.risk_counts = {'Normal': 0, 'Warning': 0, 'Critical': 0}
+
+    @classmethod
+    def from_frame(cls, df):
+        agg = super().from_frame(df)
+        if agg.count == 0:
+            return agg
+        agg.type_counts = df['equipment_type'].value_counts().to_dict()
+        issues = sum((df[field] > limit).astype(int) for field, limit in RISK_THRESHOLDS.items())
+        agg.risk_counts = {
+            'Normal': int((issues == 0).sum()),
+            'Warning': int((issues == 1).sum()),
+            'Critical': int((issues >= 2).sum()),
+        }
+        return agg
+
+    def merge(self, other):
+        super().merge(other)
+        for eq_type, count in getattr(other, 'type_counts', {}).items():
+            self.type_counts[eq_type] = self.type_counts.get(eq_type, 0) + count
+        for level, count in getattr(other, 'risk_counts', {}).items():
+            self.risk_counts[level] += count
+        return self
+
+
+# Database connections inherited from the parent, kept referenced in workers
+_inherited_connections = []
+
+
+def _init_worker():
+    # Forked workers open their own database connections instead of sharing
+    # the parent's. The inherited ones are kept alive, never closed: closing
+    # would disturb the parent's socket or roll back its open transaction.
+    for conn in connections.all(initialized_only=True):
+        _inherited_connections.append(conn.connection)
+        conn.connection = None
+
+
+def _pool(workers):
+    """
+    Process pool for one reduction.
+
+    Workers are forked wherever the platform can fork, whatever the default
+    start method (spawn on macOS, forkserver on Linux from Python 3.14), so
+    they inherit the loaded apps and settings. Where it can't (Windows),
+    spawned workers run django.setup() before their first task.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                                   initializer=_init_worker)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=django.setup)
+
+
+def _chunk_partial(chunk):
+    """Worker entry point: reduce one chunk to its partial aggregate"""
+    return ChunkAggregate.from_frame(chunk)
+
+
+def _validated_fields(chunk, rules):
+    """Validate a raw CSV chunk and keep the field-named statistics columns"""
+    rename, _ = resolve_headers(chunk.columns, rules)
+    chunk = validate_frame(drop_blank_lines(chunk.rename(columns=rename)), rules).clean
+    return chunk[list(CSV_COLUMNS)].rename(columns=CSV_COLUMNS)
+
+
+def _read_csv_range(path, start, end, header):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return pd.read_csv(io.BytesIO(data), header=None, names=header, skip_blank_lines=False)
+
+
+def _csv_range_partial(path, start, end, header, rules):
+    """Worker entry point: parse, validate and reduce one byte range of a CSV file"""
+    return _chunk_partial(_validated_fields(_read_csv_range(path, start, end, header), rules))
+
+
+def validate_csv_chunk(chunk, rules):
+    """
+    Validate one raw CSV chunk read with skip_blank_lines=False. Returns
+    (ValidationResult, ChunkAggregate of the accepted rows, lines in the chunk).
+
+    Report rows are line numbers counted from the start of the chunk (its
+    first line is 2); callers add the lines before it.
+    """
+    rename, _ = resolve_headers(chunk.columns, rules)
+    chunk = chunk.rename(columns=rename).reset_index(drop=True)
+    result = validate_frame(drop_blank_lines(chunk), rules)
+    return result, _chunk_partial(result.clean[list(CSV_COLUMNS)].rename(columns=CSV_COLUMNS)), len(chunk)
+
+
+def _csv_range_validated(path, start, end, header, rules):
+    """Worker entry point: parse and validate one byte range of a CSV file"""
+    return validate_csv_chunk(_read_csv_range(path, start, end, header), rules)
+
+
+def _queryset_range_partial(query, after, upto):
+    """Worker entry point: load and reduce the rows of a query with after < pk <= upto"""
+    queryset = Equipment.objects.all()
+    queryset.query = query
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+    if upto is not None:
+        queryset = queryset.filter(pk__lte=upto)
+    columns = ['equipment_type'] + NUMERIC_FIELDS
+    return _chunk_partial(pd.DataFrame(list(queryset.values_list(*columns)), columns=columns))
+
+
+def _imap(partial, tasks, workers):
+    """
+    Yield `partial(*task)` for each task, in order, computed in a process pool.
+
+    At most two tasks per worker are in flight, so memory stays bounded by
+    the chunk size rather than the input size.
+    """
+    if workers == 1:
+        for task in tasks:
+            yield partial(*task)
+        return
+
+    pool = _pool(workers)
+    try:
+        pending = deque()
+        for task in tasks:
+            pending.append(pool.submit(partial, *task))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def _reduce(partial, tasks, workers=None, check=None):
+    """Merge `partial(*task)` over all tasks; `check` is called after each merge (budget checks)"""
+    total = ChunkAggregate()
+    for result in _imap(partial, tasks, workers or get_workers()):
+        total.merge(result)
+        if check:
+            check()
+    return total
+
+
+def reduce_chunks(chunks, workers=None, check=None):
+    """Reduce an iterable of field-named DataFrame chunks in a process pool"""
+    return _reduce(_chunk_partial, ((chunk,) for chunk in chunks), workers, check)
+
+
+def csv_byte_ranges(path, chunk_rows=None):
+    """
+    Split a CSV file after its header into (start, end) byte ranges of about
+    `chunk_rows` rows, each ending on a line break.
+
+    Quoted fields with embedded line breaks are not supported; equipment
+    CSVs don't use them.
+    """
+    chunk_rows = chunk_rows or get_chunk_rows()
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        f.readline()
+        start = f.tell()
+        sample = f.read(ROW_SIZE_SAMPLE_BYTES)
+        row_bytes = len(sample) / max(sample.count(b'\n'), 1)
+        chunk_bytes = max(int(row_bytes * chunk_rows), 1)
+        while start < size:
+            f.seek(min(start + chunk_bytes, size))
+            f.readline()
+            end = f.tell()
+            yield start, end
+            start = end
+
+
+def _csv_range_tasks(path, chunk_rows):
+    header = list(pd.read_csv(path, nrows=0).columns)
+    rules = get_rules()
+    return ((path, start, end, header, rules) for start, end in csv_byte_ranges(path, chunk_rows))
+
+
+def validate_csv_file(path, workers=None, chunk_rows=None):
+    """
+    Yield validate_csv_chunk's (ValidationResult, ChunkAggregate, lines) per
+    byte range of a CSV file on disk, in file order, each range parsed and
+    validated by a pool worker.
+    """
+    return _imap(_csv_range_validated, _csv_range_tasks(path, chunk_rows), workers or get_workers())
+
+
+def reduce_csv_file(path, workers=None, chunk_rows=None):
+    """Parse, validate and reduce a CSV file on disk, each worker reading its own byte ranges"""
+    return _reduce(_csv_range_partial, _csv_range_tasks(path, chunk_rows), workers)
+
+
+def queryset_pk_ranges(queryset, chunk_rows=None):
+    """
+    Split a queryset into (after, upto) primary-key ranges of about
+    `chunk_rows` rows. Only keys are read, one index probe per range.
+    """
+    chunk_rows = chunk_rows or get_chunk_rows()
+    pks = queryset.order_by('pk').values_list('pk', flat=True)
+    after = None
+    while True:
+        page = pks if after is None else pks.filter(pk__gt=after)
+        boundary = list(page[chunk_rows - 1:chunk_rows])
+        if not boundary:
+            yield after, None
+            return
+        yield after, boundary[0]
+        after = boundary[0]
+
+
+def reduce_queryset(queryset, workers=None, chunk_rows=None, check=None):
+    """Reduce a queryset's readings, each worker querying its own primary-key ranges"""
+    query = queryset.order_by().query
+    tasks = ((query, after, upto) for after, upto in queryset_pk_ranges(queryset, chunk_rows))
+    return _reduce(_queryset_range_partial, tasks, workers, check)
+
+
+def csv_file_path(csv_file):
+    """Path of an upload spooled to disk or an open file, or None when it only lives in memory"""
+    if hasattr(csv_file, 'temporary_file_path'):
+        return csv_file.temporary_file_path()
+    name = getattr(csv_file, 'name', None)
+    if isinstance(csv_file, io.IOBase) and isinstance(name, str) and os.path.isfile(name):
+        return name
+    return None
+
+
+def iter_csv_chunks(csv_file, chunk_rows=None):
+    """Read a CSV in chunks in this process, keeping only rows that pass validation"""
+    rules = get_rules()
+    for chunk in pd.read_csv(csv_file, chunksize=chunk_rows or get_chunk_rows()):
+        yield _validated_fields(chunk, rules)
+
+
+def iter_queryset_chunks(queryset, chunk_rows=None, columns=None):
+    """Stream a queryset's readings (or other `columns`) in pk-ordered chunks in this process"""
+    chunk_rows = chunk_rows or get_chunk_rows()
+    columns = columns or ['equipment_type'] + NUMERIC_FIELDS
+    queryset = queryset.order_by('pk')
+    last_pk = None
+    while True:
+        page = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(page.values_list('pk', *columns)[:chunk_rows])
+        if not rows:
+            return
+        last_pk = rows[-1][0]
+        yield pd.DataFrame([row[1:] for row in rows], columns=columns)
+
+
+def analysis_summary(total):
+    """Format an aggregate like analyze_equipment_frame's summary"""
+    averages = {field: round(total.fields[field]['sum'] / total.count, 2) for field in NUMERIC_FIELDS}
+    return {
+        "total_equipment": total.count,
+        "avg_flowrate": averages['flowrate'],
+        "avg_pressure": averages['pressure'],
+        "avg_temperature": averages['temperature'],
+        "equipment_type_distribution": dict(sorted(total.type_counts.items(), key=lambda item: -item[1])),
+        "statistics": {field: total.statistics(field) for field in NUMERIC_FIELDS},
+        "risk_distribution": total.risk_counts,
+    }
+
+
+def analyze_csv_parallel(csv_file, workers=None, chunk_rows=None):
+    """Chunked, parallel analyze_equipment_frame over an uploaded CSV. Returns (summary, error)."""
+    try:
+        header = pd.read_csv(csv_file, nrows=0).columns
+        csv_file.seek(0)
+        _, missing_columns = resolve_headers(header)
+        if missing_columns:
+            return None, f"Missing required columns: {', '.join(missing_columns)}"
+
+        path = csv_file_path(csv_file)
+        if path:
+            total = reduce_csv_file(path, workers, chunk_rows)
+        else:
+            total = reduce_chunks(iter_csv_chunks(csv_file, chunk_rows), workers)
+    except Exception as e:
+        return None, f"Error analyzing CSV: {str(e)}"
+    if total.count == 0:
+        return None, "No complete rows found in CSV"
+    return analysis_summary(total), None
+
+
+def stored_summary(total):
+    """Format an aggregate of stored equipment like get_summary"""
+    summary = analysis_summary(total)
+    return {
+        "total_count": summary["total_equipment"],
+        "averages": {
+            "avg_flowrate": summary["avg_flowrate"],
+            "avg_pressure": summary["avg_pressure"],
+            "avg_temperature": summary["avg_temperature"],
+        },
+        "type_distribution": summary["equipment_type_distribution"],
+        "statistics": summary["statistics"],
+    }
@@ -0,0 +1,20 @@
+import importlib
+
+# Modules the upload, summary and report endpoints import on first use
+HEAVY_MODULES = [
+    'numpy',
+    'pandas',
+    'reportlab.lib.colors',
+    'reportlab.lib.styles',
+    'reportlab.platypus',
+    'equipment.data_analysis',
+    'equipment.parallel_stats',
+    'equipment.rollups',
+    'equipment.validation',
+]
+
+
+def preload_heavy_modules():
+    """Import the heavy modules up front, e.g. in a pre-fork master so workers share them"""
+    for name in HEAVY_MODULES:
+        importlib.import_module(name)
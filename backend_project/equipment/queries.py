@@ -0,0 +1,518 @@
+"""
+Ad-hoc aggregate queries over a tenant's raw equipment rows.
+
+A query is a JSON object:
+
+    {"filters": [{"field": "temperature", "op": "gt", "value": 120}],
+     "group_by": ["equipment_type"],
+     "aggregates": [{"fn": "avg", "field": "pressure"}, {"fn": "count"}],
+     "limit": 100}
+
+The planner can run it two ways and picks the cheaper one:
+
+- sql: one GROUP BY statement. Filters become WHERE clauses behind the
+  tenant filter, so the tenant-led indexes apply.
+- columnar: pandas scans over per-dataset column arrays. Arrays of finished
+  datasets stay in a per-process LRU cache; uncached datasets are loaded
+  with the filters pushed into the SELECT.
+
+Costs are per-row estimates (ROW_COSTS). The database can't compute a
+median, so median queries always run columnar. SQLite's StdDev is a Python
+callback that fails on one-row groups, so there std is computed from
+Sum/Sum of squares/Count in SQL instead (NULL below two rows). Loading arrays costs more than
+one SQL scan, so a dataset is only loaded into the cache once it has been
+queried WARM_AFTER_SCANS times. Compacted history has no rows and is not
+queried.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+import pandas as pd
+from django.conf import settings
+from django.db import connection, transaction, OperationalError
+from django.db.models import (Q, F, Count, Sum, Avg, Min, Max, StdDev, Case, When, Value, CharField, FloatField,
+                              IntegerField)
+from django.db.models.functions import Greatest, Sqrt
+from django.db.models.lookups import GreaterThan
+from .models import Dataset, Equipment
+from .running_stats import NUMERIC_FIELDS, RISK_THRESHOLDS
+
+# Query field -> model field
+GROUP_FIELDS = {'equipment_type': 'equipment_type', 'risk': 'risk', 'dataset': 'dataset_id'}
+FILTER_FIELDS = NUMERIC_FIELDS + list(GROUP_FIELDS)
+FILTER_OPS = ['eq', 'ne', 'gt', 'gte', 'lt', 'lte', 'in', 'between']
+TEXT_OPS = ['eq', 'ne', 'in']
+RISK_LEVELS = ['Normal', 'Warning', 'Critical']
+
+def _sqlite_std(field):
+    """Sample std from count, sum and sum of squares; NULL for fewer than two rows"""
+    count, total = Count(field), Sum(field)
+    variance = (Sum(F(field) * F(field)) - total * total / count) / (count - 1)
+    return Case(When(GreaterThan(count, 1), then=Sqrt(Greatest(variance, Value(0.0)))),
+                default=None, output_field=FloatField())
+
+
+SQL_AGGREGATES = {
+    'count': Count,
+    'sum': Sum,
+    'avg': Avg,
+    'min': Min,
+    'max': Max,
+    'std': lambda field: StdDev(field, sample=True),
+}
+FRAME_AGGREGATES = {
+    'count': 'size',
+    'sum': 'sum',
+    'avg': 'mean',
+    'min': 'min',
+    'max': 'max',
+    'std': 'std',
+    'median': 'median',
+}
+
+DEFAULT_LIMITS = {
+    'max_scan_rows': 2_000_000,
+    'max_groups': 1000,
+    'timeout': 5.0,
+    'column_cache_rows': 2_000_000,
+}
+
+# Relative cost per scanned row, measured on SQLite with benchmark_query
+ROW_COSTS = {
+    'sql': 1.0,
+    'columnar_load': 3.5,
+    'columnar_cached': 0.1,
+}
+
+WARM_AFTER_SCANS = 3
+MAX_TRACKED_DATASETS = 10_000
+
+FRAME_COLUMNS = ['dataset_id', 'equipment_type'] + NUMERIC_FIELDS
+
+
+def get_limits():
+    """Query limits; EQUIPMENT_QUERY_LIMITS overrides DEFAULT_LIMITS"""
+    return {**DEFAULT_LIMITS, **getattr(settings, 'EQUIPMENT_QUERY_LIMITS', {})}
+
+
+class QueryError(Exception):
+    """Invalid or over-limit query; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _coerce(field, op, value):
+    def one(item):
+        if field in NUMERIC_FIELDS or field == 'dataset':
+            try:
+                return int(item) if field == 'dataset' else float(item)
+            except (TypeError, ValueError, OverflowError):
+                raise QueryError(f"Filter on '{field}': {item!r} is not a number")
+        if field == 'risk' and item not in RISK_LEVELS:
+            raise QueryError(f"Filter on 'risk': use one of {', '.join(RISK_LEVELS)}")
+        return str(item)
+
+    if op == 'in':
+        if not isinstance(value, list) or not value:
+            raise QueryError(f"Filter on '{field}': 'in' needs a non-empty list")
+        return [one(item) for item in value]
+    if op == 'between':
+        if not isinstance(value, list) or len(value) != 2:
+            raise QueryError(f"Filter on '{field}': 'between' needs [low, high]")
+        return [one(item) for item in value]
+    return one(value)
+
+
+def _list(spec, key, default):
+    """spec[key] as a list, or `default` when it is missing or empty"""
+    value = spec.get(key) or default
+    if not isinstance(value, list):
+        raise QueryError(f"{key} must be a list")
+    return value
+
+
+class Query:
+    """A validated query spec"""
+
+    def __init__(self, filters, group_by, aggregates, limit, engine, explain):
+        self.filters = filters
+        self.group_by = group_by
+        self.aggregates = aggregates
+        self.limit = limit
+        self.engine = engine
+        self.explain = explain
+
+    @classmethod
+    def parse(cls, spec, limits):
+        if not isinstance(spec, dict):
+            raise QueryError("Query must be a JSON object")
+
+        filters = []
+        for item in _list(spec, 'filters', []):
+            if not isinstance(item, dict):
+                raise QueryError("Each filter must be an object with field, op and value")
+            field, op = item.get('field'), item.get('op', 'eq')
+            if not isinstance(field, str) or field not in FILTER_FIELDS:
+                raise QueryError(f"Unknown filter field {field!r}; use one of {', '.join(FILTER_FIELDS)}")
+            allowed = TEXT_OPS if field in ['equipment_type', 'risk'] else FILTER_OPS
+            if not isinstance(op, str) or op not in allowed:
+                raise QueryError(f"Filter on '{field}': op must be one of {', '.join(allowed)}")
+            filters.append((field, op, _coerce(field, op, item.get('value'))))
+
+        group_by = spec.get('group_by') or []
+        if isinstance(group_by, str):
+            group_by = [group_by]
+        if not isinstance(group_by, list):
+            raise QueryError("group_by must be a list")
+        for field in group_by:
+            if not isinstance(field, str) or field not in GROUP_FIELDS:
+                raise QueryError(f"Cannot group by {field!r}; use one of {', '.join(GROUP_FIELDS)}")
+        if len(set(group_by)) != len(group_by):
+            raise QueryError("group_by fields must be unique")
+
+        aggregates = []
+        for item in _list(spec, 'aggregates', [{'fn': 'count'}]):
+            if not isinstance(item, dict):
+                raise QueryError("Each aggregate must be an object with fn and field")
+            fn, field = item.get('fn'), item.get('field')
+            if not isinstance(fn, str) or fn not in FRAME_AGGREGATES:
+                raise QueryError(f"Unknown aggregate {fn!r}; use one of {', '.join(FRAME_AGGREGATES)}")
+            if fn == 'count':
+                field = None
+            elif not isinstance(field, str) or field not in NUMERIC_FIELDS:
+                raise QueryError(f"Aggregate '{fn}' needs a field: one of {', '.join(NUMERIC_FIELDS)}")
+            aggregates.append((f"{fn}_{field}" if field else fn, fn, field))
+        names = [name for name, _, _ in aggregates]
+        if len(set(names)) != len(names):
+            raise QueryError("Aggregates must be unique")
+
+        try:
+            limit = int(spec.get('limit', 100))
+        except (TypeError, ValueError):
+            raise QueryError("limit must be an integer")
+        if not 1 <= limit <= limits['max_groups']:
+            raise QueryError(f"limit must be between 1 and {limits['max_groups']}")
+
+        engine = spec.get('engine', 'auto')
+        if engine not in ['auto', 'sql', 'columnar']:
+            raise QueryError("engine must be auto, sql or columnar")
+
+        return cls(filters, group_by, aggregates, limit, engine, bool(spec.get('explain')))
+
+    @property
+    def row_filters(self):
+        """Filters evaluated per row; dataset filters only narrow the scope"""
+        return [f for f in self.filters if f[0] != 'dataset']
+
+    def uses_risk(self):
+        return 'risk' in self.group_by or any(field == 'risk' for field, _, _ in self.filters)
+
+
+def _q(lookup, op, value):
+    if op == 'eq':
+        return Q(**{lookup: value})
+    if op == 'ne':
+        return ~Q(**{lookup: value})
+    if op == 'between':
+        return Q(**{f'{lookup}__range': value})
+    return Q(**{f'{lookup}__{op}': value})
+
+
+def _risk_issues():
+    issues = Value(0)
+    for field, limit in RISK_THRESHOLDS.items():
+        issues = issues + Case(When(**{f'{field}__gt': limit}, then=Value(1)), default=Value(0),
+                               output_field=IntegerField())
+    return issues
+
+
+def filtered_queryset(tenant, query, dataset_ids=None):
+    """Equipment rows matching the query's filters, with `risk` annotated when used"""
+    qs = Equipment.objects.filter(tenant=tenant).order_by()
+    if dataset_ids is not None:
+        qs = qs.filter(dataset_id__in=dataset_ids)
+    if query.uses_risk():
+        qs = qs.annotate(risk_issues=_risk_issues()).annotate(risk=Case(
+            When(risk_issues=0, then=Value('Normal')),
+            When(risk_issues=1, then=Value('Warning')),
+            default=Value('Critical'),
+            output_field=CharField(),
+        ))
+    for field, op, value in query.row_filters:
+        qs = qs.filter(_q(GROUP_FIELDS.get(field, field), op, value))
+    return qs
+
+
+def compile_sql(tenant, query, dataset_ids):
+    """The GROUP BY queryset for a query"""
+    qs = filtered_queryset(tenant, query, dataset_ids)
+    functions = {**SQL_AGGREGATES, 'std': _sqlite_std} if connection.vendor == 'sqlite' else SQL_AGGREGATES
+    aggregates = {name: functions[fn](field or 'id') for name, fn, field in query.aggregates}
+    # An ungrouped query groups by the (constant) tenant so both shapes are one statement
+    group_columns = [GROUP_FIELDS[field] for field in query.group_by] or ['tenant']
+    return qs.values(*group_columns).annotate(**aggregates).order_by(*group_columns)
+
+
+@contextmanager
+def statement_timeout(seconds):
+    """Abort database statements still running after `seconds` (SQLite and PostgreSQL)"""
+    deadline = time.monotonic() + seconds
+    try:
+        if connection.vendor == 'sqlite':
+            connection.ensure_connection()
+            connection.connection.set_progress_handler(lambda: time.monotonic() > deadline, 10_000)
+            try:
+                yield deadline
+            finally:
+                connection.connection.set_progress_handler(None, 0)
+        elif connection.vendor == 'postgresql':
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL statement_timeout = %s", [int(seconds * 1000)])
+                yield deadline
+        else:
+            yield deadline
+    except OperationalError as e:
+        if time.monotonic() > deadline or 'statement timeout' in str(e):
+            raise QueryError(f"Query exceeded the {seconds:g}s time limit", status=504) from e
+        raise
+
+
+def check_deadline(deadline, seconds):
+    if time.monotonic() > deadline:
+        raise QueryError(f"Query exceeded the {seconds:g}s time limit", status=504)
+
+
+# Column arrays of finished datasets and scan counts, per worker process
+_frames = OrderedDict()
+_scans = OrderedDict()
+_frames_lock = threading.Lock()
+
+
+def _cached_frame(dataset_id):
+    with _frames_lock:
+        frame = _frames.get(dataset_id)
+        if frame is not None:
+            _frames.move_to_end(dataset_id)
+        return frame
+
+
+def _cache_frame(dataset_id, frame, max_rows):
+    if len(frame) > max_rows:
+        return
+    with _frames_lock:
+        _frames[dataset_id] = frame
+        total = sum(len(f) for f in _frames.values())
+        while total > max_rows:
+            _, evicted = _frames.popitem(last=False)
+            total -= len(evicted)
+
+
+def cached_dataset_ids():
+    with _frames_lock:
+        return set(_frames)
+
+
+def _record_scans(dataset_ids):
+    """Count a scan of each dataset. Returns the ids scanned at least WARM_AFTER_SCANS times."""
+    hot = set()
+    with _frames_lock:
+        for dataset_id in dataset_ids:
+            _scans[dataset_id] = _scans.pop(dataset_id, 0) + 1
+            if _scans[dataset_id] >= WARM_AFTER_SCANS:
+                hot.add(dataset_id)
+        while len(_scans) > MAX_TRACKED_DATASETS:
+            _scans.popitem(last=False)
+    return hot
+
+
+def _load_frame(queryset):
+    frame = pd.DataFrame(list(queryset.values_list(*FRAME_COLUMNS)), columns=FRAME_COLUMNS)
+    frame['equipment_type'] = frame['equipment_type'].astype('category')
+    return frame
+
+
+def _frame_mask(df, field, op, value):
+    column = df[GROUP_FIELDS.get(field, field)]
+    if op == 'eq':
+        return column == value
+    if op == 'ne':
+        return column != value
+    if op == 'in':
+        return column.isin(value)
+    if op == 'between':
+        return column.between(value[0], value[1])
+    return {'gt': column.gt, 'gte': column.ge, 'lt': column.lt, 'lte': column.le}[op](value)
+
+
+def _with_risk(df):
+    issues = sum((df[field] > limit).astype(int) for field, limit in RISK_THRESHOLDS.items())
+    return df.assign(risk=pd.cut(issues, [-1, 0, 1, len(RISK_THRESHOLDS)], labels=RISK_LEVELS).astype(str))
+
+
+def run_columnar(tenant, query, datasets, warm, limits, deadline):
+    """Scan column arrays; returns (rows, pushdown queryset or None)"""
+    frames, full, filtered = [], [], []
+    for dataset_id, _, is_live in datasets:
+        frame = None if is_live else _cached_frame(dataset_id)
+        if frame is not None:
+            frames.append(frame)
+        elif query.row_filters and dataset_id not in warm:
+            filtered.append(dataset_id)
+        else:
+            full.append((dataset_id, is_live))
+
+    pushdown = None
+    if filtered:
+        # Only matching rows leave the database; partial arrays aren't cached
+        pushdown = filtered_queryset(tenant, query, filtered)
+        frames.append(_load_frame(pushdown))
+    if full:
+        live_ids = {dataset_id for dataset_id, is_live in full if is_live}
+        loaded = _load_frame(Equipment.objects.filter(tenant=tenant, dataset_id__in=[d for d, _ in full]).order_by())
+        for dataset_id, part in loaded.groupby('dataset_id', sort=False):
+            if dataset_id not in live_ids:
+                _cache_frame(dataset_id, part.reset_index(drop=True), limits['column_cache_rows'])
+        frames.append(loaded)
+    check_deadline(deadline, limits['timeout'])
+
+    frames = [f for f in frames if len(f)]
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=FRAME_COLUMNS)
+    if query.uses_risk():
+        df = _with_risk(df)
+    for field, op, value in query.row_filters:
+        df = df[_frame_mask(df, field, op, value)]
+
+    group_columns = [GROUP_FIELDS[field] for field in query.group_by]
+    if not group_columns:
+        df = df.assign(_all=0)
+    named = {
+        name: (field or 'dataset_id', FRAME_AGGREGATES[fn]) for name, fn, field in query.aggregates
+    }
+    result = df.groupby(group_columns or ['_all'], observed=True).agg(**named).reset_index()
+    check_deadline(deadline, limits['timeout'])
+    return result.drop(columns=['_all'], errors='ignore').head(query.limit + 1).to_dict(orient='records'), pushdown
+
+
+def plan_query(tenant, query, limits):
+    """Choose an engine from per-row cost estimates. Returns (plan, datasets, datasets to cache)."""
+    scope = Dataset.objects.filter(tenant=tenant).order_by('id')
+    for field, op, value in query.filters:
+        if field == 'dataset':
+            scope = scope.filter(_q('id', op, value))
+    datasets = list(scope.values_list('id', 'total_records', 'is_live'))
+
+    cached = cached_dataset_ids()
+    hot = _record_scans(dataset_id for dataset_id, _, _ in datasets)
+    scope_rows = sum(total for _, total, _ in datasets)
+    cached_rows = sum(total for dataset_id, total, is_live in datasets if not is_live and dataset_id in cached)
+    warm = {dataset_id for dataset_id, total, is_live in datasets
+            if total and not is_live and dataset_id in hot and dataset_id not in cached
+            and total <= limits['column_cache_rows']}
+
+    fns = {fn for _, fn, _ in query.aggregates}
+    sql_cost = math.inf if 'median' in fns else scope_rows * ROW_COSTS['sql']
+    columnar_cost = (cached_rows * ROW_COSTS['columnar_cached']
+                     + (scope_rows - cached_rows) * ROW_COSTS['columnar_load'])
+
+    if query.engine != 'auto':
+        engine, reason = query.engine, "requested"
+    elif sql_cost == math.inf:
+        engine, reason = 'columnar', "median is not computed in SQL"
+    elif columnar_cost < sql_cost:
+        engine, reason = 'columnar', "lower estimated cost"
+    elif warm:
+        # Pay the load once; later scans of these datasets come from the cache
+        engine, reason = 'columnar', "loading frequently queried datasets into the column cache"
+    else:
+        engine, reason = 'sql', "lower estimated cost"
+    if engine == 'sql' and sql_cost == math.inf:
+        raise QueryError("median needs the columnar engine")
+
+    plan = {
+        "engine": engine,
+        "reason": reason,
+        "datasets": len(datasets),
+        "estimated_rows": scope_rows,
+        "cached_rows": cached_rows,
+        "warming": sorted(warm) if engine == 'columnar' else [],
+        "costs": {
+            "sql": None if sql_cost == math.inf else round(sql_cost),
+            "columnar": round(columnar_cost),
+        },
+    }
+    return plan, datasets, warm
+
+
+def execute_query(tenant, spec):
+    """
+    Validate, plan and run a query for a tenant.
+
+    Raises QueryError for invalid specs (400), row limits (413) and time
+    limits (504).
+    """
+    limits = get_limits()
+    query = Query.parse(spec, limits)
+    started = time.monotonic()
+    plan, datasets, warm = plan_query(tenant, query, limits)
+    dataset_ids = [dataset_id for dataset_id, _, _ in datasets]
+    scoped_ids = dataset_ids if any(field == 'dataset' for field, _, _ in query.filters) else None
+
+    with statement_timeout(limits['timeout']) as deadline:
+        if plan['estimated_rows'] > limits['max_scan_rows']:
+            # The dataset totals are an upper bound; count what the filters really match
+            matched = filtered_queryset(tenant, query, scoped_ids).count()
+            plan['matched_rows'] = matched
+            if matched > limits['max_scan_rows']:
+                raise QueryError(
+                    f"Query matches {matched} rows; the limit is {limits['max_scan_rows']}. "
+                    "Narrow it with dataset or equipment_type filters.",
+                    status=413
+                )
+
+        if plan['engine'] == 'sql':
+            queryset = compile_sql(tenant, query, scoped_ids)
+            rows = list(queryset[:query.limit + 1])
+            if not query.group_by:
+                rows = [{k: v for k, v in row.items() if k != 'tenant'} for row in rows]
+        else:
+            rows, queryset = run_columnar(tenant, query, datasets, warm, limits, deadline)
+
+        if query.explain:
+            # Columnar scans served entirely from the cache run no SQL
+            plan["sql"] = str(queryset.query) if queryset is not None else None
+            plan["database_plan"] = queryset.explain() if queryset is not None else None
+
+    if not rows and not query.group_by:
+        rows = [{name: 0 if fn == 'count' else None for name, fn, _ in query.aggregates}]
+
+    columns = list(query.group_by) + [name for name, _, _ in query.aggregates]
+    data = [_output_row(row, query) for row in rows[:query.limit]]
+    return {
+        "columns": columns,
+        "rows": data,
+        "row_count": len(data),
+        "truncated": len(rows) > query.limit,
+        "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        "plan": plan,
+    }
+
+
+def _output_row(row, query):
+    out = {}
+    for field in query.group_by:
+        value = row[GROUP_FIELDS[field]]
+        out[field] = int(value) if field == 'dataset' else str(value)
+    for name, fn, _ in query.aggregates:
+        value = row[name]
+        if fn == 'count':
+            out[name] = int(value)
+        elif value is None or (isinstance(value, float) and math.isnan(value)):
+            out[name] = None
+        else:
+            out[name] = round(float(value), 2)
+    return out
@@ -0,0 +1,244 @@
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from .models import Equipment, Dataset, EquipmentRollup
+from .running_stats import NUMERIC_FIELDS
+from .sketches import TDigest
+
+DEFAULT_BUCKET_SECONDS = 3600
+
+
+def get_bucket_seconds():
+    """Rollup bucket width, configurable via ROLLUP_BUCKET_SECONDS"""
+    return int(getattr(settings, 'ROLLUP_BUCKET_SECONDS', DEFAULT_BUCKET_SECONDS))
+
+
+class Aggregate:
+    """Mergeable count/sum/M2/min/max and quantile sketch per numeric field"""
+
+    def __init__(self):
+        self.count = 0
+        self.fields = {field: {'sum': 0.0, 'm2': 0.0, 'min': None, 'max': None} for field in NUMERIC_FIELDS}
+        self.sketches = {field: TDigest() for field in NUMERIC_FIELDS}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Aggregate a DataFrame with flowrate/pressure/temperature columns"""
+        agg = cls()
+        agg.count = len(df)
+        if agg.count == 0:
+            return agg
+        for field in NUMERIC_FIELDS:
+            values = df[field]
+            mean = values.mean()
+            agg.fields[field] = {
+                'sum': float(values.sum()),
+                'm2': float(((values - mean) ** 2).sum()),
+                'min': float(values.min()),
+                'max': float(values.max()),
+            }
+            agg.sketches[field] = TDigest.from_values(values.to_numpy())
+        return agg
+
+    @classmethod
+    def from_rollup(cls, rollup):
+        agg = cls()
+        agg.count = rollup.count
+        for field in NUMERIC_FIELDS:
+            agg.fields[field] = {
+                'sum': getattr(rollup, f'{field}_sum'),
+                'm2': getattr(rollup, f'{field}_m2'),
+                'min': getattr(rollup, f'{field}_min'),
+                'max': getattr(rollup, f'{field}_max'),
+            }
+            if field in rollup.sketches:
+                agg.sketches[field] = TDigest.from_dict(rollup.sketches[field])
+        return agg
+
+    def apply_to(self, rollup):
+        """Write this aggregate's values onto a rollup row"""
+        rollup.count = self.count
+        for field in NUMERIC_FIELDS:
+            for stat in ['sum', 'm2', 'min', 'max']:
+                setattr(rollup, f'{field}_{stat}', self.fields[field][stat])
+        rollup.sketches = {field: sketch.to_dict() for field, sketch in self.sketches.items()}
+        return rollup
+
+    def merge(self, other):
+        """Combine another aggregate into this one (Chan et al. parallel update for M2)"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        for field in NUMERIC_FIELDS:
+            a, b = self.fields[field], other.fields[field]
+            if self.count == 0:
+                self.fields[field] = dict(b)
+            else:
+                delta = b['sum'] / other.count - a['sum'] / self.count
+                a['m2'] += b['m2'] + delta ** 2 * self.count * other.count / total
+                a['sum'] += b['sum']
+                a['min'] = min(a['min'], b['min'])
+                a['max'] = max(a['max'], b['max'])
+            self.sketches[field].merge(other.sketches[field])
+        self.count = total
+        return self
+
+    def statistics(self, field):
+        stats = self.fields[field]
+        std = (stats['m2'] / (self.count - 1)) ** 0.5 if self.count > 1 else 0
+        return {
+            "min": round(stats['min'], 2),
+            "max": round(stats['max'], 2),
+            "median": round(self.sketches[field].median(), 2),
+            "std": round(std, 2),
+        }
+
+
+def equipment_frame(queryset):
+    """Load type, timestamp and readings for a queryset into a DataFrame"""
+    columns = ['equipment_type', 'uploaded_at'] + NUMERIC_FIELDS
+    return pd.DataFrame(list(queryset.values_list(*columns)), columns=columns)
+
+
+def _bucket(timestamps, bucket_seconds):
+    return pd.to_datetime(timestamps, utc=True).dt.floor(f'{bucket_seconds}s')
+
+
+def compact_dataset(dataset, bucket_seconds=None, budget=None):
+    """
+    Fold a dataset's rows into rollups, then delete the dataset and its raw rows.
+
+    The dataset row stays locked while its rows are read, merged and deleted,
+    so concurrent compactions fold a dataset in once; a dataset that is
+    already gone is skipped and counts 0 rows. Rows are read in chunks (sized
+    to `budget` when given) and merged into one Aggregate per type and bucket,
+    so memory doesn't grow with the dataset.
+    """
+    from .budgets import checked_chunks
+    from .parallel_stats import iter_queryset_chunks
+
+    bucket_seconds = bucket_seconds or get_bucket_seconds()
+    columns = ['equipment_type', 'uploaded_at'] + NUMERIC_FIELDS
+    with transaction.atomic():
+        if not Dataset.objects.select_for_update().filter(id=dataset.id).exists():
+            return 0
+
+        chunks = iter_queryset_chunks(Equipment.objects.filter(dataset=dataset),
+                                      budget.chunk_rows() if budget else None, columns)
+        if budget:
+            chunks = checked_chunks(chunks, budget, "compacting history")
+
+        partials = {}
+        compacted = 0
+        for chunk in chunks:
+            compacted += len(chunk)
+            chunk['bucket_start'] = _bucket(chunk['uploaded_at'], bucket_seconds)
+            for key, group in chunk.groupby(['equipment_type', 'bucket_start']):
+                agg = Aggregate.from_frame(group)
+                partials[key] = partials[key].merge(agg) if key in partials else agg
+
+        for (eq_type, bucket_start), agg in partials.items():
+            bucket_start = bucket_start.to_pydatetime()
+            rollup = (EquipmentRollup.objects.select_for_update()
+                      .filter(tenant=dataset.tenant, equipment_type=eq_type,
+                              bucket_start=bucket_start, bucket_seconds=bucket_seconds)
+                      .first())
+            if rollup is None:
+                rollup = EquipmentRollup(tenant=dataset.tenant, equipment_type=eq_type,
+                                         bucket_start=bucket_start, bucket_seconds=bucket_seconds)
+            else:
+                agg = Aggregate.from_rollup(rollup).merge(agg)
+            agg.apply_to(rollup).save()
+        dataset.delete()
+    return compacted
+
+
+def compact_old_datasets(keep=5, tenant=None):
+    """Compact each tenant's non-live datasets beyond its newest `keep`. Returns rows compacted."""
+    tenants = [tenant] if tenant else Dataset.objects.order_by().values_list('tenant', flat=True).distinct()
+    compacted = 0
+    for tenant in list(tenants):
+        for dataset in Dataset.objects.filter(tenant=tenant, is_live=False)[keep:]:
+            compacted += compact_dataset(dataset)
+    return compacted
+
+
+def summarize_with_rollups(raw_df, rollups):
+    """Summary in the get_summary shape over raw rows plus compacted history"""
+    type_counts = raw_df['equipment_type'].value_counts().to_dict() if len(raw_df) else {}
+    return summarize_aggregate_with_rollups(Aggregate.from_frame(raw_df), type_counts, rollups)
+
+
+def summarize_aggregate_with_rollups(total, type_counts, rollups):
+    """summarize_with_rollups for raw rows already reduced to an Aggregate (merged in place)"""
+    raw_count = total.count
+    type_counts = dict(type_counts)
+    rollup_rows = 0
+    for rollup in rollups.iterator():
+        rollup_rows += 1
+        total.merge(Aggregate.from_rollup(rollup))
+        type_counts[rollup.equipment_type] = type_counts.get(rollup.equipment_type, 0) + rollup.count
+
+    if total.count == 0:
+        return None
+
+    return {
+        "total_count": total.count,
+        "averages": {
+            f"avg_{field}": round(total.fields[field]['sum'] / total.count, 2) for field in NUMERIC_FIELDS
+        },
+        "type_distribution": dict(sorted(type_counts.items(), key=lambda item: -item[1])),
+        "statistics": {field: total.statistics(field) for field in NUMERIC_FIELDS},
+        "history": {
+            "rollup_rows": rollup_rows,
+            "compacted_records": total.count - raw_count,
+        },
+    }
+
+
+def trend(bucket_seconds, tenant, equipment_type=None):
+    """Per-bucket count, averages, min and max combining a tenant's rollups with raw rows"""
+    raw = Equipment.objects.filter(tenant=tenant).order_by()
+    rollups = EquipmentRollup.objects.filter(tenant=tenant).order_by()
+    if equipment_type:
+        raw = raw.filter(equipment_type=equipment_type)
+        rollups = rollups.filter(equipment_type=equipment_type)
+
+    # Rows of one load share uploaded_at, so the database reduces raw rows to
+    # one line per load and only those lines are bucketed here
+    sql_aggregates = {'count': Count('id')}
+    for field in NUMERIC_FIELDS:
+        sql_aggregates.update({f'{field}_sum': Sum(field), f'{field}_min': Min(field), f'{field}_max': Max(field)})
+    frames = []
+    raw_df = pd.DataFrame(list(raw.values('uploaded_at').annotate(**sql_aggregates)))
+    if len(raw_df):
+        raw_df['bucket_start'] = _bucket(raw_df.pop('uploaded_at'), bucket_seconds)
+        frames.append(raw_df)
+
+    rollup_columns = ['bucket_start', 'count'] + [
+        f'{field}_{stat}' for field in NUMERIC_FIELDS for stat in ['sum', 'min', 'max']
+    ]
+    rollup_df = pd.DataFrame(list(rollups.values_list(*rollup_columns)), columns=rollup_columns)
+    if len(rollup_df):
+        rollup_df['bucket_start'] = _bucket(rollup_df['bucket_start'], bucket_seconds)
+        frames.append(rollup_df)
+
+    if not frames:
+        return []
+
+    combined = pd.concat(frames, ignore_index=True)
+    agg = {'count': 'sum'}
+    for field in NUMERIC_FIELDS:
+        agg.update({f'{field}_sum': 'sum', f'{field}_min': 'min', f'{field}_max': 'max'})
+    combined = combined.groupby('bucket_start').agg(agg).reset_index().sort_values('bucket_start')
+
+    buckets = []
+    for row in combined.itertuples(index=False):
+        bucket = {"bucket_start": row.bucket_start.isoformat(), "count": int(row.count)}
+        for field in NUMERIC_FIELDS:
+            bucket[f"avg_{field}"] = round(getattr(row, f'{field}_sum') / row.count, 2)
+            bucket[f"min_{field}"] = round(getattr(row, f'{field}_min'), 2)
+            bucket[f"max_{field}"] = round(getattr(row, f'{field}_max'), 2)
+        buckets.append(bucket)
+    return buckets
@@ -0,0 +1,121 @@
+import math
+
+NUMERIC_FIELDS = ['flowrate', 'pressure', 'temperature']
+
+# A reading above any of these limits counts as one issue
+RISK_THRESHOLDS = {'pressure': 10, 'temperature': 120, 'flowrate': 100}
+
+
+class RunningStats:
+    """
+    Incrementally updated statistics for equipment readings.
+
+    Keeps Welford moments (count, mean, M2) plus min/max per numeric field,
+    type counts and risk counts. Two instances can be merged, so partial
+    results from separate batches combine into the same totals.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.moments = {field: {'mean': 0.0, 'm2': 0.0, 'min': None, 'max': None} for field in NUMERIC_FIELDS}
+        self.type_counts = {}
+        self.risk_counts = {'Normal': 0, 'Warning': 0, 'Critical': 0}
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        if data:
+            stats.count = data['count']
+            stats.moments = data['moments']
+            stats.type_counts = data['type_counts']
+            stats.risk_counts = data['risk_counts']
+        return stats
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'moments': self.moments,
+            'type_counts': self.type_counts,
+            'risk_counts': self.risk_counts,
+        }
+
+    def update(self, columns):
+        """Fold a batch of column arrays into the running totals"""
+        batch = RunningStats()
+        n = len(columns['equipment_type'])
+        if n == 0:
+            return self
+        batch.count = n
+
+        for field in NUMERIC_FIELDS:
+            values = columns[field]
+            mean = math.fsum(values) / n
+            batch.moments[field] = {
+                'mean': mean,
+                'm2': math.fsum((v - mean) ** 2 for v in values),
+                'min': min(values),
+                'max': max(values),
+            }
+
+        for eq_type in columns['equipment_type']:
+            batch.type_counts[eq_type] = batch.type_counts.get(eq_type, 0) + 1
+
+        for i in range(n):
+            issues = sum(1 for field, limit in RISK_THRESHOLDS.items() if columns[field][i] > limit)
+            level = 'Normal' if issues == 0 else 'Warning' if issues == 1 else 'Critical'
+            batch.risk_counts[level] += 1
+
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Combine another RunningStats into this one (Chan et al. parallel update)"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+
+        for field in NUMERIC_FIELDS:
+            a, b = self.moments[field], other.moments[field]
+            if self.count == 0:
+                self.moments[field] = dict(b)
+                continue
+            delta = b['mean'] - a['mean']
+            a['mean'] += delta * other.count / total
+            a['m2'] += b['m2'] + delta ** 2 * self.count * other.count / total
+            a['min'] = min(a['min'], b['min'])
+            a['max'] = max(a['max'], b['max'])
+
+        for eq_type, count in other.type_counts.items():
+            self.type_counts[eq_type] = self.type_counts.get(eq_type, 0) + count
+        for level, count in other.risk_counts.items():
+            self.risk_counts[level] = self.risk_counts.get(level, 0) + count
+
+        self.count = total
+        return self
+
+    def std(self, field):
+        """Sample standard deviation, matching pandas' ddof=1"""
+        if self.count < 2:
+            return 0
+        return math.sqrt(self.moments[field]['m2'] / (self.count - 1))
+
+    def summary(self):
+        """Summary in the same shape as get_summary (no median, which isn't incremental)"""
+        if self.count == 0:
+            return {"total_count": 0, "averages": {}, "type_distribution": {}}
+
+        return {
+            "total_count": self.count,
+            "averages": {
+                f"avg_{field}": round(self.moments[field]['mean'], 2) for field in NUMERIC_FIELDS
+            },
+            "type_distribution": dict(sorted(self.type_counts.items(), key=lambda item: -item[1])),
+            "statistics": {
+                field: {
+                    "min": round(self.moments[field]['min'], 2),
+                    "max": round(self.moments[field]['max'], 2),
+                    "std": round(self.std(field), 2),
+                }
+                for field in NUMERIC_FIELDS
+            },
+            "risk_distribution": self.risk_counts,
+        }
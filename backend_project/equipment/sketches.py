@@ -0,0 +1,97 @@
+import numpy as np
+
+DEFAULT_COMPRESSION = 100
+
+
+class TDigest:
+    """
+    Mergeable quantile sketch (merging t-digest with the k1 scale function).
+
+    Holds at most ~compression centroids regardless of how many values were
+    added. Quantiles near the median are typically within 1% of the value
+    range for compression=100, and tighter towards the tails. Min and max are
+    tracked exactly.
+    """
+
+    def __init__(self, compression=DEFAULT_COMPRESSION):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = None
+        self.max = None
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        digest = cls(compression)
+        digest.add_values(values)
+        return digest
+
+    @classmethod
+    def from_dict(cls, data):
+        digest = cls(data.get('compression', DEFAULT_COMPRESSION))
+        digest.means = np.asarray(data['means'], dtype=float)
+        digest.weights = np.asarray(data['weights'], dtype=float)
+        digest.min = data['min']
+        digest.max = data['max']
+        return digest
+
+    def to_dict(self):
+        return {
+            'compression': self.compression,
+            'means': self.means.tolist(),
+            'weights': self.weights.tolist(),
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def add_values(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        self._absorb(values, np.ones(values.size), float(values.min()), float(values.max()))
+        return self
+
+    def merge(self, other):
+        if other.weights.size == 0:
+            return self
+        self._absorb(other.means, other.weights, other.min, other.max)
+        return self
+
+    def _absorb(self, means, weights, low, high):
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.means, self.weights = self._compress(
+            np.concatenate([self.means, means]),
+            np.concatenate([self.weights, weights]),
+        )
+
+    def _compress(self, means, weights):
+        """Re-bin weighted points so that each centroid spans at most one unit of k"""
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = np.floor(self.compression * (np.arcsin(2 * q - 1) / np.pi + 0.5)).astype(np.int64)
+        starts = np.concatenate([[0], np.flatnonzero(np.diff(k)) + 1])
+        merged_weights = np.add.reduceat(weights, starts)
+        merged_means = np.add.reduceat(means * weights, starts) / merged_weights
+        return merged_means, merged_weights
+
+    def quantile(self, q):
+        if self.weights.size == 0:
+            return None
+        if self.weights.size == 1:
+            return float(self.means[0])
+        total = self.weights.sum()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [total]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q * total, positions, values))
+
+    def median(self):
+        return self.quantile(0.5)
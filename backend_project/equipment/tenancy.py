@@ -0,0 +1,97 @@
+"""
+Tenant resolution and per-tenant retention.
+
+A tenant is the owner of datasets: a user ("user:<id>"), a team backed by a
+django.contrib.auth Group ("team:<id>"), or "public" for anonymous callers.
+The key is stored on Dataset, Equipment and EquipmentRollup so every
+per-tenant query can use indexes led by it.
+"""
+from django.conf import settings
+from django.contrib.auth.models import User
+
+PUBLIC_TENANT = 'public'
+
+DEFAULT_QUOTA = {
+    'max_datasets': 5,
+    'max_rows': None,
+}
+
+
+class TenantError(Exception):
+    """Raised for a token that doesn't resolve to an active user (401), or a team that is malformed (400) or not theirs (403)"""
+
+    def __init__(self, message, status=403):
+        super().__init__(message)
+        self.status = status
+
+
+def request_user(request):
+    """Caller resolved from a DRF token, falling back to the session user"""
+    auth = request.META.get('HTTP_AUTHORIZATION', '').split()
+    if auth and auth[0].lower() == 'token':
+        from rest_framework.authentication import TokenAuthentication
+        from rest_framework.exceptions import AuthenticationFailed
+        if len(auth) != 2:
+            raise TenantError("Invalid token header", status=401)
+        try:
+            # Same checks as DRF views: the key exists and its user is active
+            user, _ = TokenAuthentication().authenticate_credentials(auth[1])
+        except AuthenticationFailed as e:
+            raise TenantError(str(e.detail), status=401)
+        return user
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user
+    return None
+
+
+def tenant_for(request):
+    """
+    Tenant key for a request.
+
+    A `team` query or form parameter selects a team the caller belongs to;
+    otherwise the caller's own user tenant is used.
+    """
+    user = request_user(request)
+    team_id = request.GET.get('team') or request.POST.get('team')
+    if team_id:
+        if not (team_id.isascii() and team_id.isdigit()):
+            raise TenantError("team must be a numeric group id", status=400)
+        team_id = int(team_id)
+        if user is None or not User.groups.through.objects.filter(user_id=user.pk, group_id=team_id).exists():
+            raise TenantError("Not a member of this team")
+        return f"team:{team_id}"
+    if user is not None:
+        return f"user:{user.pk}"
+    return PUBLIC_TENANT
+
+
+def quota_for(tenant):
+    """Retention quota for a tenant from EQUIPMENT_TENANT_QUOTAS (falls back to 'default')"""
+    quotas = getattr(settings, 'EQUIPMENT_TENANT_QUOTAS', {})
+    return {**DEFAULT_QUOTA, **quotas.get('default', {}), **quotas.get(tenant, {})}
+
+
+def enforce_retention(tenant, budget=None):
+    """Compact a tenant's oldest datasets into rollups until it is within quota (in chunks sized to `budget`)"""
+    from .models import Dataset
+    from .rollups import compact_dataset
+
+    quota = quota_for(tenant)
+    datasets = list(
+        Dataset.objects.filter(tenant=tenant, is_live=False).only('id', 'tenant', 'total_records')
+    )
+    keep, extra = datasets[:quota['max_datasets']], datasets[quota['max_datasets']:]
+
+    # Row quota: drop the oldest kept datasets too, but never the newest one
+    if quota['max_rows'] is not None:
+        rows = sum(ds.total_records for ds in keep)
+        while len(keep) > 1 and rows > quota['max_rows']:
+            oldest = keep.pop()
+            rows -= oldest.total_records
+            extra.append(oldest)
+
+    compacted = 0
+    for dataset in extra:
+        compacted += compact_dataset(dataset, budget=budget)
+    return compacted
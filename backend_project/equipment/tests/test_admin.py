@@ -0,0 +1,36 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from .utils import make_dataset
+
+
+class EquipmentAdminTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(User.objects.create_superuser('admin', password='pw'))
+        self.datasets = [make_dataset('public', [(f'E{i}', 'Pump', 90.0, 5.0, 100.0)] * 2, f'd{i}.csv')
+                         for i in range(7)]
+
+    def changelist(self, dataset):
+        return self.client.get(f'/admin/equipment/equipment/?dataset={dataset}')
+
+    def test_rejects_malformed_dataset_filter(self):
+        response = self.changelist('abc')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('e=1', response['Location'])
+
+    def test_whole_table_count_ignores_id_gaps(self):
+        # Retention compacts datasets from the middle of the id range
+        self.datasets[3].delete()
+        self.assertEqual(self.changelist('all').context['cl'].result_count, 12)
+
+    def test_every_dataset_is_reachable(self):
+        oldest = self.datasets[0]
+        response = self.changelist(oldest.id)
+        self.assertEqual(response.context['cl'].result_count, 2)
+        choices = response.context['cl'].filter_specs[0].lookup_choices
+        self.assertIn(str(oldest.id), [value for value, _ in choices])
+
+        response = self.client.get('/admin/equipment/dataset/')
+        self.assertContains(response, f'/admin/equipment/equipment/?dataset={oldest.id}', count=1)
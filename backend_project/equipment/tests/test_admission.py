@@ -0,0 +1,143 @@
+import threading
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from ..admission import EndpointGate, Rejected
+
+
+class EndpointGateTests(TestCase):
+    """Rate limits, concurrency slots and the fair wait queue of one worker's gate"""
+
+    def setUp(self):
+        cache.clear()
+
+    def gate(self, **limits):
+        return EndpointGate('test', {
+            'rate_per_minute': 6000, 'burst': 100, 'max_concurrent': 1,
+            'max_concurrent_per_user': 1, 'max_queue': 10, 'queue_timeout': 5, **limits,
+        })
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 5
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "timed out waiting for the gate")
+            time.sleep(0.001)
+
+    def test_freed_slots_go_round_robin_across_users(self):
+        gate = self.gate()
+        gate.acquire('a')
+        admitted = []
+
+        def request(user_key):
+            gate.acquire(user_key)
+            admitted.append(user_key)
+
+        threads = []
+        for user_key in ['a', 'a', 'b']:
+            thread = threading.Thread(target=request, args=(user_key,))
+            thread.start()
+            threads.append(thread)
+            self.wait_for(lambda: gate.waiting_count == len(threads))
+
+        for expected in range(1, 4):
+            gate.release(admitted[-1] if admitted else 'a')
+            self.wait_for(lambda: len(admitted) == expected)
+        gate.release(admitted[-1])
+        for thread in threads:
+            thread.join()
+
+        # FIFO would admit a, a, b; the second 'a' goes to the back of the line
+        self.assertEqual(admitted, ['a', 'b', 'a'])
+        self.assertEqual(gate.snapshot()['active'], 0)
+
+    def test_per_user_cap_lets_other_users_in(self):
+        gate = self.gate(max_concurrent=2)
+        gate.acquire('a')
+        gate.acquire('b')
+        self.assertEqual(gate.snapshot()['active'], 2)
+
+    def test_queued_request_times_out(self):
+        gate = self.gate(queue_timeout=0.05)
+        gate.acquire('a')
+        with self.assertRaises(Rejected) as raised:
+            gate.acquire('b')
+        self.assertIn('timed out', raised.exception.reason)
+        snapshot = gate.snapshot()
+        self.assertEqual((snapshot['waiting'], snapshot['waiting_users'], snapshot['rejected_timeout']), (0, 0, 1))
+
+        # The slot is still usable once released
+        gate.release('a')
+        gate.acquire('b')
+
+    def test_full_queue_is_rejected(self):
+        gate = self.gate(max_queue=0)
+        gate.acquire('a')
+        with self.assertRaises(Rejected) as raised:
+            gate.acquire('b')
+        self.assertEqual(raised.exception.reason, 'queue full')
+
+    @mock.patch('time.time', return_value=1000.0)
+    def test_rate_limit(self, _time):
+        gate = self.gate(rate_per_minute=1, burst=1, max_concurrent=5)
+        gate.acquire('a')
+        with self.assertRaises(Rejected) as raised:
+            gate.acquire('a')
+        self.assertEqual(raised.exception.reason, 'rate limit exceeded')
+        self.assertEqual(raised.exception.retry_after, 20.0)
+        gate.acquire('b')
+
+
+class SharedLimitTests(TestCase):
+    """Gates in different workers share per-user counters through the cache"""
+
+    def setUp(self):
+        cache.clear()
+
+    def gates(self, **limits):
+        limits = {
+            'rate_per_minute': 6000, 'burst': 100, 'max_concurrent': 2,
+            'max_concurrent_per_user': 1, 'max_queue': 10, 'queue_timeout': 5, **limits,
+        }
+        return EndpointGate('test', limits), EndpointGate('test', limits)
+
+    def test_user_busy_in_another_worker_is_rejected_without_waiting(self):
+        first, second = self.gates()
+        first.acquire('a')
+        with self.assertRaises(Rejected) as raised:
+            second.acquire('a')
+        self.assertEqual(raised.exception.reason, 'too many concurrent requests')
+        self.assertEqual(second.snapshot()['rejected_user_busy'], 1)
+        second.acquire('b')
+
+        first.release('a')
+        second.acquire('a')
+
+    def test_rate_is_counted_across_workers(self):
+        first, second = self.gates(rate_per_minute=2, burst=2)
+        with mock.patch('time.time', return_value=1000.0):
+            first.acquire('a')
+            first.release('a')
+            second.acquire('a')
+            second.release('a')
+            with self.assertRaises(Rejected) as raised:
+                first.acquire('a')
+        self.assertEqual(raised.exception.reason, 'rate limit exceeded')
+
+    def test_slot_freed_in_another_worker_reaches_the_queue(self):
+        first, second = self.gates(max_concurrent_per_user=2)
+        first.acquire('a')
+        second.acquire('a')
+        admitted = threading.Event()
+
+        def request():
+            second.acquire('a')
+            admitted.set()
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        self.assertFalse(admitted.wait(0.3))
+        first.release('a')
+        self.assertTrue(admitted.wait(5))
+        thread.join()
+        self.assertEqual(second.snapshot()['active'], 2)
@@ -0,0 +1,85 @@
+import gzip
+import io
+from unittest import mock
+import pandas as pd
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from ..budgets import MemoryBudget
+from ..ingest import ingest_csv_chunked
+from ..models import Dataset, Equipment, EquipmentRollup
+from ..rollups import compact_dataset
+from ..validation import validate_equipment_csv
+from .utils import make_dataset, random_frame
+
+
+@override_settings(EQUIPMENT_ADMISSION_ENABLED=False, PARALLEL_STATS_WORKERS=1)
+@mock.patch('equipment.budgets._sample', return_value=0)
+class ChunkedFallbackTests(TestCase):
+    """Chunked paths give the results of the in-memory ones"""
+
+    def setUp(self):
+        cache.clear()
+
+    def random_rows(self, count, seed=0):
+        df = random_frame(count, seed)
+        return [(f'E{i}', *row) for i, row in enumerate(df.itertuples(index=False))]
+
+    def test_chunk_rows_allow_for_chunks_in_flight(self, _sample):
+        budget = MemoryBudget('test', 100, None)
+        self.assertEqual(budget.chunk_rows(500, default=10**9), 41943)
+        self.assertEqual(budget.chunk_rows(500, default=10**9, in_flight=4), 10485)
+        self.assertEqual(budget.mode, 'chunked')
+
+    def test_chunked_summary_matches_in_memory(self, _sample):
+        make_dataset('public', self.random_rows(3000))
+        in_memory = self.client.get('/api/summary/').json()
+        cache.clear()
+        with override_settings(PARALLEL_STATS_MIN_ROWS=1000, PARALLEL_STATS_CHUNK_ROWS=700):
+            chunked = self.client.get('/api/summary/').json()
+
+        self.assertEqual(chunked['total_count'], 3000)
+        for key in ['total_count', 'averages', 'type_distribution']:
+            self.assertEqual(chunked[key], in_memory[key], key)
+        for field, stats in in_memory['statistics'].items():
+            for stat in ['min', 'max', 'std']:
+                self.assertEqual(chunked['statistics'][field][stat], stats[stat], (field, stat))
+
+    def test_parallel_threshold_uses_dataset_totals(self, _sample):
+        make_dataset('public', self.random_rows(50))
+        with override_settings(PARALLEL_STATS_MIN_ROWS=10), CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/summary/').json()['total_count'], 50)
+        counts = [q['sql'] for q in queries if 'COUNT' in q['sql'] and 'equipment_equipment' in q['sql']]
+        self.assertEqual(counts, [])
+
+    def test_budgeted_compaction_matches_single_pass(self, _sample):
+        rows = self.random_rows(2500)
+        make_dataset('whole', rows)
+        make_dataset('chunked', rows)
+        compact_dataset(Dataset.objects.get(tenant='whole'), 3600)
+        # 1000-row chunks
+        compact_dataset(Dataset.objects.get(tenant='chunked'), 3600, MemoryBudget('test', 1, None))
+
+        fields = ['equipment_type', 'count', 'flowrate_min', 'flowrate_max', 'pressure_max', 'temperature_min']
+        whole = list(EquipmentRollup.objects.filter(tenant='whole').order_by('equipment_type').values(*fields))
+        chunked = list(EquipmentRollup.objects.filter(tenant='chunked').order_by('equipment_type').values(*fields))
+        self.assertEqual(chunked, whole)
+        self.assertFalse(Dataset.objects.filter(tenant__in=['whole', 'chunked']).exists())
+
+    def test_chunked_upload_reports_csv_line_numbers(self, _sample):
+        df = pd.DataFrame(self.random_rows(5000), columns=['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
+        df['Flowrate'] = df['Flowrate'].astype(object)
+        df.loc[[3, 1500, 4999], 'Flowrate'] = 'bad'
+        df.loc[2600, 'Pressure'] = -1
+        data = df.to_csv(index=False).encode()
+
+        expected, _ = validate_equipment_csv(io.BytesIO(data))
+        dataset = Dataset.objects.create(filename='chunked.csv', tenant='public')
+        # Two 1048-row chunks in flight fit a 5 MB budget
+        total, validation = ingest_csv_chunked(io.BytesIO(data), dataset, MemoryBudget('test', 5, None))
+
+        self.assertEqual(total.count, len(expected.clean))
+        self.assertEqual(Equipment.objects.filter(dataset=dataset).count(), len(expected.clean))
+        self.assertEqual(gzip.decompress(validation.to_csv_gz()), gzip.decompress(expected.to_csv_gz()))
+        validation.close()
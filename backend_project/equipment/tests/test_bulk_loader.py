@@ -0,0 +1,36 @@
+from django.test import TestCase
+from django.utils import timezone
+from ..bulk_loader import bulk_load_equipment
+from ..models import Dataset, Equipment
+from .utils import COLUMNS
+
+
+class BulkLoaderTests(TestCase):
+
+    def setUp(self):
+        self.dataset = Dataset.objects.create(filename='load.csv', tenant='team:7')
+        self.rows = [(f'E{i}', ['Pump', 'Valve'][i % 2], 50.0 + i, 2.5 + i, -10.0 + i) for i in range(12)]
+
+    def load(self, rows, batch_size=None):
+        return bulk_load_equipment(self.dataset, {column: [row[i] for row in rows] for i, column in enumerate(COLUMNS)},
+                                   batch_size=batch_size)
+
+    def test_rows_match_the_columns_across_batches(self):
+        self.assertEqual(self.load(self.rows, batch_size=5), len(self.rows))
+
+        stored = Equipment.objects.filter(dataset=self.dataset).order_by('id')
+        self.assertEqual([tuple(getattr(e, column) for column in COLUMNS) for e in stored], self.rows)
+        self.assertEqual(set(stored.values_list('tenant', flat=True)), {'team:7'})
+
+    def test_one_uploaded_at_for_the_whole_load(self):
+        before = timezone.now()
+        self.load(self.rows, batch_size=5)
+        after = timezone.now()
+
+        timestamps = set(Equipment.objects.filter(dataset=self.dataset).values_list('uploaded_at', flat=True))
+        self.assertEqual(len(timestamps), 1)
+        self.assertTrue(before <= timestamps.pop() <= after)
+
+    def test_empty_columns_write_nothing(self):
+        self.assertEqual(self.load([]), 0)
+        self.assertFalse(Equipment.objects.exists())
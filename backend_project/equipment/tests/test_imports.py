@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.test import SimpleTestCase
+
+HEAVY = ['pandas', 'reportlab']
+
+
+class LazyImportTests(SimpleTestCase):
+    """Workers and the URLconf start without the heavy analysis modules"""
+
+    def test_urls_load_without_pandas_or_reportlab(self):
+        # A fresh interpreter: this one already imported pandas for other tests
+        code = (
+            "import sys, django; django.setup(); import equipment.urls; "
+            f"print(','.join(name for name in {HEAVY!r} if name in sys.modules))"
+        )
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run([sys.executable, '-c', code], cwd=settings.BASE_DIR, env=env,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '')
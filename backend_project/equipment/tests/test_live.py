@@ -0,0 +1,80 @@
+import json
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from ..models import Dataset, Equipment
+from ..running_stats import NUMERIC_FIELDS, RunningStats
+from .utils import random_frame
+
+
+class RunningStatsTests(TestCase):
+    """Batched running statistics match pandas over the whole frame"""
+
+    def test_batches_match_pandas(self):
+        df = random_frame(5_000, seed=1)
+        stats = RunningStats()
+        for start, end in [(0, 1), (1, 2), (2, 2500), (2500, len(df))]:
+            part = df.iloc[start:end]
+            stats.update({column: part[column].tolist() for column in part.columns})
+
+        self.assertEqual(stats.count, len(df))
+        self.assertEqual(stats.type_counts, df['equipment_type'].value_counts().to_dict())
+        for field in NUMERIC_FIELDS:
+            self.assertAlmostEqual(stats.moments[field]['mean'], df[field].mean(), places=9)
+            self.assertAlmostEqual(stats.std(field), df[field].std(), places=9)
+            self.assertEqual(stats.moments[field]['min'], df[field].min())
+
+    def test_round_trips_through_dict(self):
+        stats = RunningStats().update({column: random_frame(50)[column].tolist()
+                                       for column in ['equipment_type'] + NUMERIC_FIELDS})
+        self.assertEqual(RunningStats.from_dict(stats.to_dict()).summary(), stats.summary())
+
+
+@override_settings(EQUIPMENT_ADMISSION_ENABLED=False)
+class LiveIngestionTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.dataset_id = self.client.post('/api/live/', '{}', content_type='application/json').json()['dataset_id']
+
+    def append(self, *readings, raw=None):
+        body = raw if raw is not None else '\n'.join(json.dumps(reading) for reading in readings)
+        return self.client.post(f'/api/live/{self.dataset_id}/append/', body, content_type='application/x-ndjson')
+
+    def reading(self, i, **overrides):
+        return {'equipment_name': f'P{i}', 'equipment_type': 'Pump', 'flowrate': 90 + i,
+                'pressure': 5, 'temperature': 100, **overrides}
+
+    def test_every_batch_is_written_through(self):
+        self.assertEqual(self.append(self.reading(1), self.reading(2)).json(), {'accepted': 2, 'written': 2})
+        # Nothing stays in worker memory: rows and stats are stored before the response
+        self.assertEqual(Equipment.objects.filter(dataset_id=self.dataset_id).count(), 2)
+        self.append(self.reading(3))
+        response = self.client.post(f'/api/live/{self.dataset_id}/close/')
+        self.assertEqual(response.json()['summary']['total_count'], 3)
+        self.assertEqual(Dataset.objects.get(id=self.dataset_id).total_records, 3)
+
+    def test_append_after_close_is_not_found(self):
+        self.client.post(f'/api/live/{self.dataset_id}/close/')
+        self.assertEqual(self.append(self.reading(1)).status_code, 404)
+        self.assertFalse(Equipment.objects.filter(dataset_id=self.dataset_id).exists())
+
+    def test_non_finite_readings_are_rejected(self):
+        for value in ['NaN', 'Infinity', '-Infinity']:
+            line = json.dumps(self.reading(2)).replace('"flowrate": 92', f'"flowrate": {value}')
+            response = self.append(raw=json.dumps(self.reading(1)) + '\n\n' + line)
+            self.assertEqual(response.status_code, 400, value)
+            self.assertIn('Line 3', response.json()['error'])
+        self.assertFalse(Equipment.objects.filter(dataset_id=self.dataset_id).exists())
+
+    def test_readings_go_through_validation_rules(self):
+        for reading in [self.reading(1, flowrate=-5), self.reading(1, equipment_name='  '),
+                        self.reading(1, equipment_type='x' * 101)]:
+            response = self.append(self.reading(0), reading)
+            self.assertEqual(response.status_code, 400, reading)
+            self.assertIn('Line 2', response.json()['error'])
+        self.assertFalse(Equipment.objects.filter(dataset_id=self.dataset_id).exists())
+        self.assertEqual(RunningStats.from_dict(Dataset.objects.get(id=self.dataset_id).live_stats).count, 0)
+
+    def test_malformed_lines(self):
+        for body in ['{"x": 1}', 'not json', '[1, 2]', json.dumps(self.reading(1, pressure='high'))]:
+            self.assertEqual(self.append(raw=body).status_code, 400, body)
@@ -0,0 +1,80 @@
+import multiprocessing
+import os
+import tempfile
+from unittest import mock
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from ..parallel_stats import analysis_summary, reduce_csv_file, reduce_queryset, stored_summary, validate_csv_file
+from .utils import make_dataset, random_frame
+
+
+def csv_path(rows=3000):
+    """Upload-shaped CSV on disk with a few rejected rows"""
+    df = random_frame(rows).rename(columns={
+        'equipment_type': 'Type', 'flowrate': 'Flowrate', 'pressure': 'Pressure', 'temperature': 'Temperature',
+    })
+    df.insert(0, 'Equipment Name', [f'E{i}' for i in range(rows)])
+    df.loc[[5, 1700], 'Pressure'] = -1
+    lines = df.to_csv(index=False).split('\n')
+    # Blank lines after data lines 100 and 2000 (file lines 101 and 2001)
+    lines[2001:2001] = ['']
+    lines[101:101] = ['', '']
+    handle, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(handle, 'w') as f:
+        f.write('\n'.join(lines))
+    return path
+
+
+class CsvPoolTests(TestCase):
+    """Pool workers parse their own byte ranges of a file on disk"""
+
+    def setUp(self):
+        self.path = csv_path()
+        self.addCleanup(os.remove, self.path)
+        self.expected = analysis_summary(reduce_csv_file(self.path, workers=1, chunk_rows=400))
+
+    def default_start_method(self, method):
+        previous = multiprocessing.get_start_method()
+        multiprocessing.set_start_method(method, force=True)
+        self.addCleanup(multiprocessing.set_start_method, previous, force=True)
+
+    def test_workers_match_a_single_process(self):
+        # spawn is the macOS default, forkserver the Linux one from Python 3.14
+        for method in ['spawn', 'forkserver']:
+            self.default_start_method(method)
+            total = reduce_csv_file(self.path, workers=2, chunk_rows=400)
+            self.assertEqual(analysis_summary(total), self.expected, method)
+
+    @mock.patch('multiprocessing.get_all_start_methods', return_value=['spawn'])
+    def test_spawned_workers_set_django_up(self, _methods):
+        total = reduce_csv_file(self.path, workers=2, chunk_rows=400)
+        self.assertEqual(analysis_summary(total), self.expected)
+
+    def test_validated_ranges_come_back_in_file_order(self):
+        results = list(validate_csv_file(self.path, workers=2, chunk_rows=400))
+        self.assertGreater(len(results), 2)
+        self.assertEqual(sum(result.rows_checked for result, _, _ in results), 3000)
+        self.assertEqual(sum(partial.count for _, partial, _ in results), 2998)
+        # Chunk-relative report rows, offset by the lines before each chunk
+        offset, rows = 0, []
+        for result, _, lines in results:
+            rows += [row + offset for row in result.errors['row']]
+            offset += lines
+        self.assertEqual(rows, [7, 1704])
+
+
+class QuerysetPoolTests(TransactionTestCase):
+    """Pool workers query their own primary-key ranges"""
+
+    def setUp(self):
+        # Forked workers inherit SQLite's in-memory test database; spawned ones start without it
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db() \
+                and 'fork' not in multiprocessing.get_all_start_methods():
+            self.skipTest("spawned workers can't see an in-memory test database")
+
+    def test_workers_match_a_single_process(self):
+        df = random_frame(2000)
+        dataset = make_dataset('public', [(f'E{i}', *row) for i, row in enumerate(df.itertuples(index=False))])
+        equipment = dataset.equipment.all()
+        expected = stored_summary(reduce_queryset(equipment, workers=1, chunk_rows=300))
+        self.assertEqual(stored_summary(reduce_queryset(equipment, workers=2, chunk_rows=300)), expected)
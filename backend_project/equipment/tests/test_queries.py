@@ -0,0 +1,119 @@
+from django.test import TestCase, override_settings
+from .. import queries
+from ..models import Dataset
+from ..queries import QueryError, execute_query
+from .utils import make_dataset
+
+
+class QueryPlannerTests(TestCase):
+
+    def setUp(self):
+        queries._frames.clear()
+        queries._scans.clear()
+        self.tenant = 'user:1'
+        self.dataset = make_dataset(self.tenant, [
+            ('P1', 'Pump', 90.0, 5.0, 100.0),
+            ('P2', 'Pump', 110.0, 12.0, 130.0),
+            ('V1', 'Valve', 60.0, 11.0, 110.0),
+            ('R1', 'Reactor', 150.0, 20.0, 150.0),
+        ])
+
+    def test_median_runs_columnar(self):
+        result = execute_query(self.tenant, {'aggregates': [{'fn': 'median', 'field': 'flowrate'}]})
+        self.assertEqual(result['plan']['engine'], 'columnar')
+        self.assertIsNone(result['plan']['costs']['sql'])
+        self.assertEqual(result['rows'], [{'median_flowrate': 100.0}])
+
+    def test_median_cannot_be_forced_into_sql(self):
+        with self.assertRaises(QueryError) as raised:
+            execute_query(self.tenant, {'aggregates': [{'fn': 'median', 'field': 'flowrate'}], 'engine': 'sql'})
+        self.assertEqual(raised.exception.status, 400)
+
+    def test_std_of_single_row_groups_is_null(self):
+        spec = {'group_by': ['risk'], 'aggregates': [{'fn': 'std', 'field': 'pressure'}, {'fn': 'count'}]}
+        for engine in ['auto', 'sql', 'columnar']:
+            result = execute_query(self.tenant, {**spec, 'engine': engine})
+            rows = {row['risk']: row for row in result['rows']}
+            # Normal: P1; Warning: V1; Critical: P2 and R1
+            self.assertEqual(rows['Normal'], {'risk': 'Normal', 'std_pressure': None, 'count': 1}, engine)
+            self.assertEqual(rows['Warning'], {'risk': 'Warning', 'std_pressure': None, 'count': 1}, engine)
+            self.assertEqual(rows['Critical']['std_pressure'], 5.66, engine)
+
+    def test_sql_and_columnar_agree(self):
+        spec = {
+            'filters': [{'field': 'flowrate', 'op': 'between', 'value': [60, 150]}],
+            'group_by': ['equipment_type'],
+            'aggregates': [{'fn': fn, 'field': 'temperature'} for fn in ['sum', 'avg', 'min', 'max', 'std']],
+        }
+        sql = execute_query(self.tenant, {**spec, 'engine': 'sql'})
+        columnar = execute_query(self.tenant, {**spec, 'engine': 'columnar'})
+        self.assertEqual(sql['rows'], columnar['rows'])
+        self.assertEqual([row['equipment_type'] for row in sql['rows']], ['Pump', 'Reactor', 'Valve'])
+
+    def test_empty_result_without_groups(self):
+        result = execute_query(self.tenant, {
+            'filters': [{'field': 'pressure', 'op': 'gt', 'value': 1000}],
+            'aggregates': [{'fn': 'count'}, {'fn': 'avg', 'field': 'pressure'}],
+        })
+        self.assertEqual(result['rows'], [{'count': 0, 'avg_pressure': None}])
+
+    def test_frequently_queried_datasets_are_cached(self):
+        spec = {'aggregates': [{'fn': 'sum', 'field': 'flowrate'}]}
+        plans = [execute_query(self.tenant, spec)['plan'] for _ in range(queries.WARM_AFTER_SCANS + 1)]
+        self.assertEqual([plan['engine'] for plan in plans[:2]], ['sql', 'sql'])
+        self.assertEqual(plans[2]['warming'], [self.dataset.id])
+        self.assertEqual((plans[3]['engine'], plans[3]['cached_rows']), ('columnar', 4))
+
+    def test_live_and_empty_datasets_are_not_cached(self):
+        Dataset.objects.filter(id=self.dataset.id).update(is_live=True)
+        for _ in range(queries.WARM_AFTER_SCANS + 1):
+            plan = execute_query(self.tenant, {'aggregates': [{'fn': 'count'}]})['plan']
+        self.assertEqual(plan['warming'], [])
+        self.assertEqual(queries.cached_dataset_ids(), set())
+
+    def test_other_tenants_rows_are_invisible(self):
+        make_dataset('user:2', [('X', 'Pump', 1.0, 1.0, 1.0)])
+        result = execute_query(self.tenant, {'aggregates': [{'fn': 'count'}]})
+        self.assertEqual(result['rows'], [{'count': 4}])
+
+    def test_invalid_specs(self):
+        for spec in [
+            [],
+            {'filters': [{'field': 'owner', 'op': 'eq', 'value': 1}]},
+            {'filters': [{'field': 'equipment_type', 'op': 'gt', 'value': 'Pump'}]},
+            {'filters': [{'field': 'pressure', 'op': 'between', 'value': [1]}]},
+            {'filters': [{'field': 'pressure', 'op': 'gt', 'value': 10 ** 400}]},
+            {'filters': [{'field': 'risk', 'op': 'eq', 'value': 'Bad'}]},
+            {'filters': {'field': 'pressure', 'op': 'gt', 'value': 1}},
+            {'filters': [{'field': ['pressure'], 'op': 'gt', 'value': 1}]},
+            {'filters': [{'field': 'pressure', 'op': ['gt'], 'value': 1}]},
+            {'group_by': ['equipment_name']},
+            {'group_by': 5},
+            {'group_by': [['risk']]},
+            {'group_by': {'risk': 1}},
+            {'group_by': ['risk', 'risk']},
+            {'aggregates': [{'fn': 'avg'}]},
+            {'aggregates': [{'fn': ['avg'], 'field': 'pressure'}]},
+            {'aggregates': [{'fn': 'avg', 'field': ['pressure']}]},
+            {'aggregates': {'fn': 'count'}},
+            {'aggregates': [{'fn': 'count'}, {'fn': 'count'}]},
+            {'limit': 0},
+            {'engine': 'gpu'},
+        ]:
+            with self.assertRaises(QueryError, msg=spec) as raised:
+                execute_query(self.tenant, spec)
+            self.assertEqual(raised.exception.status, 400)
+
+    @override_settings(EQUIPMENT_QUERY_LIMITS={'max_scan_rows': 2})
+    def test_scan_limit_counts_matching_rows(self):
+        with self.assertRaises(QueryError) as raised:
+            execute_query(self.tenant, {'aggregates': [{'fn': 'count'}]})
+        self.assertEqual(raised.exception.status, 413)
+
+        # Filters that narrow the scan under the limit are allowed
+        result = execute_query(self.tenant, {'filters': [{'field': 'equipment_type', 'op': 'eq', 'value': 'Pump'}]})
+        self.assertEqual((result['rows'], result['plan']['matched_rows']), ([{'count': 2}], 2))
+
+    def test_limit_truncates_groups(self):
+        result = execute_query(self.tenant, {'group_by': ['equipment_type'], 'limit': 2})
+        self.assertEqual((result['row_count'], result['truncated']), (2, True))
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from ..models import Dataset, Equipment, EquipmentRollup
+from ..rollups import Aggregate, compact_dataset
+from ..running_stats import NUMERIC_FIELDS
+from .utils import make_dataset, random_frame
+
+
+class MergeTests(TestCase):
+    """Partial aggregates merge to the statistics pandas computes over the whole frame"""
+
+    def test_aggregate_merge_matches_pandas(self):
+        df = random_frame(10_000)
+        total = Aggregate()
+        for start, end in [(0, 7), (7, 3000), (3000, 3001), (3001, len(df))]:
+            part = df.iloc[start:end]
+            total.merge(Aggregate.from_frame(part))
+
+        self.assertEqual(total.count, len(df))
+        for field in NUMERIC_FIELDS:
+            stats = total.statistics(field)
+            self.assertAlmostEqual(total.fields[field]['sum'] / total.count, df[field].mean(), places=9)
+            self.assertAlmostEqual(stats['std'], round(df[field].std(), 2))
+            self.assertEqual(stats['min'], round(df[field].min(), 2))
+            self.assertEqual(stats['max'], round(df[field].max(), 2))
+            value_range = df[field].max() - df[field].min()
+            self.assertLess(abs(stats['median'] - df[field].median()), value_range * 0.01)
+
+    def test_merging_empty_aggregate_is_a_no_op(self):
+        agg = Aggregate.from_frame(random_frame(10))
+        before = {field: dict(values) for field, values in agg.fields.items()}
+        agg.merge(Aggregate())
+        self.assertEqual(agg.count, 10)
+        self.assertEqual(agg.fields, before)
+
+
+class CompactionTests(TestCase):
+    """Compacted history keeps contributing to summaries and trends"""
+
+    def setUp(self):
+        cache.clear()
+        self.old = make_dataset('public', [
+            ('P1', 'Pump', 90.0, 5.0, 100.0),
+            ('V1', 'Valve', 60.0, 11.0, 110.0),
+        ], 'old.csv')
+        self.new = make_dataset('public', [
+            ('P2', 'Pump', 110.0, 12.0, 130.0),
+            ('R1', 'Reactor', 150.0, 20.0, 150.0),
+        ], 'new.csv')
+        # Two hours earlier, in its own hourly bucket
+        hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+        Equipment.objects.filter(dataset=self.old).update(uploaded_at=hour - timedelta(hours=2))
+        self.assertEqual(compact_dataset(self.old, 3600), 2)
+
+    def test_dataset_compacted_elsewhere_is_skipped(self):
+        # A second compaction that picked the dataset before the first deleted it
+        stale = Dataset(id=self.old.id, tenant='public')
+        self.assertEqual(compact_dataset(stale, 3600), 0)
+        self.assertEqual(sum(EquipmentRollup.objects.values_list('count', flat=True)), 2)
+
+    def test_summary_combines_rollups_with_raw_rows(self):
+        summary = self.client.get('/api/summary/').json()
+        self.assertEqual(summary['total_count'], 4)
+        self.assertEqual(summary['averages'], {'avg_flowrate': 102.5, 'avg_pressure': 12.0, 'avg_temperature': 122.5})
+        self.assertEqual(summary['type_distribution'], {'Pump': 2, 'Valve': 1, 'Reactor': 1})
+        self.assertEqual(summary['history'], {'rollup_rows': 2, 'compacted_records': 2})
+        self.assertEqual(summary['statistics']['pressure']['std'], 6.16)
+        self.assertEqual((summary['statistics']['flowrate']['min'], summary['statistics']['flowrate']['max']),
+                         (60.0, 150.0))
+
+    def test_trend_buckets_raw_rows_and_rollups(self):
+        buckets = self.client.get('/api/trend/').json()['buckets']
+        self.assertEqual([bucket['count'] for bucket in buckets], [2, 2])
+        self.assertEqual((buckets[0]['avg_flowrate'], buckets[0]['min_pressure'], buckets[0]['max_pressure']),
+                         (75.0, 5.0, 11.0))
+        self.assertEqual((buckets[1]['avg_flowrate'], buckets[1]['max_temperature']), (130.0, 150.0))
+
+        pumps = self.client.get('/api/trend/?equipment_type=Pump').json()['buckets']
+        self.assertEqual([(bucket['count'], bucket['avg_flowrate']) for bucket in pumps], [(1, 90.0), (1, 110.0)])
+
+        # Wider buckets merge both hours
+        day = self.client.get('/api/trend/?bucket_seconds=86400').json()['buckets']
+        self.assertEqual(sum(bucket['count'] for bucket in day), 4)
+        for bucket_seconds in ['abc', '0', '5400']:
+            self.assertEqual(self.client.get(f'/api/trend/?bucket_seconds={bucket_seconds}').status_code, 400)
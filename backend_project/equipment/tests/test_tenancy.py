@@ -0,0 +1,78 @@
+import io
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from ..models import Dataset
+from .utils import make_dataset
+
+
+@override_settings(EQUIPMENT_ADMISSION_ENABLED=False)
+class TenancyTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user('alice')
+        self.bob = User.objects.create_user('bob')
+        self.team = Group.objects.create(name='plant')
+        self.alice.groups.add(self.team)
+        self.alice_client = self.client_for(self.alice)
+        self.bob_client = self.client_for(self.bob)
+        self.bob_dataset = make_dataset(f'user:{self.bob.pk}', [('B1', 'Pump', 90.0, 5.0, 100.0)])
+
+    def client_for(self, user):
+        client = self.client_class()
+        client.defaults['HTTP_AUTHORIZATION'] = f'Token {Token.objects.create(user=user).key}'
+        return client
+
+    def upload(self, client, query=''):
+        csv_file = io.BytesIO(b"Equipment Name,Type,Flowrate,Pressure,Temperature\nP1,Pump,90,5,100\n")
+        csv_file.name = 'plant.csv'
+        return client.post('/api/upload/' + query, {'file': csv_file})
+
+    def test_other_tenants_datasets_are_not_found(self):
+        dataset_id = self.bob_dataset.id
+        self.assertEqual(self.alice_client.get(f'/api/summary/?dataset_id={dataset_id}').status_code, 404)
+        self.assertEqual(self.alice_client.get(f'/api/report/pdf/?dataset_id={dataset_id}').status_code, 404)
+        self.assertEqual(self.bob_client.get(f'/api/summary/?dataset_id={dataset_id}').status_code, 200)
+        self.assertEqual(self.alice_client.get('/api/datasets/').json()['datasets'], [])
+
+    def test_team_requires_membership(self):
+        self.assertEqual(self.bob_client.get(f'/api/summary/?team={self.team.pk}').status_code, 403)
+        self.assertEqual(self.upload(self.bob_client, f'?team={self.team.pk}').status_code, 403)
+        self.assertEqual(self.upload(self.alice_client, f'?team={self.team.pk}').status_code, 201)
+        self.assertEqual(Dataset.objects.filter(tenant=f'team:{self.team.pk}').count(), 1)
+
+    def test_malformed_team_id_is_a_bad_request(self):
+        for team in ['abc', '1.5', '²']:
+            self.assertEqual(self.alice_client.get(f'/api/summary/?team={team}').status_code, 400, team)
+        response = self.upload(self.alice_client, '?team=abc')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Dataset.objects.filter(filename='plant.csv').exists())
+
+    def test_team_id_is_normalised(self):
+        self.upload(self.alice_client, f'?team=0{self.team.pk}')
+        self.assertEqual(list(Dataset.objects.filter(filename='plant.csv').values_list('tenant', flat=True)),
+                         [f'team:{self.team.pk}'])
+
+    def test_summary_cache_follows_changes_made_elsewhere(self):
+        self.assertEqual(self.bob_client.get('/api/summary/').json()['total_count'], 1)
+        # Written without going through this worker's views, as another worker would
+        make_dataset(f'user:{self.bob.pk}', [('B2', 'Valve', 60.0, 11.0, 110.0)])
+        self.assertEqual(self.bob_client.get('/api/summary/').json()['total_count'], 2)
+        Dataset.objects.filter(id=self.bob_dataset.id).delete()
+        self.assertEqual(self.bob_client.get('/api/summary/').json()['total_count'], 1)
+
+    def test_unresolved_tokens_are_unauthorized(self):
+        inactive = self.client_for(User.objects.create_user('carol', is_active=False))
+        bogus = self.client_class(HTTP_AUTHORIZATION='Token not-a-key')
+        Token.objects.filter(user=self.bob).delete()
+        for client in [inactive, bogus, self.bob_client]:
+            self.assertEqual(client.get('/api/summary/').status_code, 401)
+            self.assertEqual(self.upload(client).status_code, 401)
+        self.assertFalse(Dataset.objects.filter(filename='plant.csv').exists())
+
+    @override_settings(EQUIPMENT_ADMISSION_ENABLED=True)
+    def test_unresolved_tokens_are_unauthorized_at_the_gate(self):
+        client = self.client_class(HTTP_AUTHORIZATION='Token not-a-key')
+        self.assertEqual(client.post('/api/query/', '{}', content_type='application/json').status_code, 401)
@@ -0,0 +1,111 @@
+import io
+import json
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from ..models import Equipment
+from ..validation import DEFAULT_RULES, validate_equipment_csv
+
+HEADER = "Equipment Name,Type,Flowrate,Pressure,Temperature\n"
+
+
+def validate(text):
+    validation, error = validate_equipment_csv(io.StringIO(text))
+    assert error is None, error
+    return validation
+
+
+def errors(validation):
+    return [(row['row'], row['column'], row['error']) for row in validation.errors.to_dict(orient='records')]
+
+
+class RuleTests(TestCase):
+
+    def test_default_rules(self):
+        validation = validate(HEADER + "\n".join([
+            "P1,Pump,90,5,100",
+            ",Pump,90,5,100",
+            "P3,Pump,fast,5,100",
+            "P4,Pump,-1,5,100",
+            "P5,Pump,90,5,-300",
+            f"P6,{'x' * 101},90,5,100",
+        ]) + "\n")
+        self.assertEqual(validation.rows_checked, 6)
+        self.assertEqual(validation.clean['Equipment Name'].tolist(), ['P1'])
+        self.assertEqual(errors(validation), [
+            (3, 'Equipment Name', 'missing'),
+            (4, 'Flowrate', 'not a number'),
+            (5, 'Flowrate', 'below minimum 0'),
+            (6, 'Temperature', 'below minimum -273.15'),
+            (7, 'Type', 'longer than 100 characters'),
+        ])
+
+    def test_infinite_readings_are_rejected_once(self):
+        validation = validate(HEADER + "P1,Pump,inf,5,100\nP2,Pump,90,-inf,100\nP3,Pump,90,5,Infinity\n")
+        self.assertTrue(validation.clean.empty)
+        self.assertEqual(errors(validation), [
+            (2, 'Flowrate', 'not a finite number'),
+            (3, 'Pressure', 'not a finite number'),
+            (4, 'Temperature', 'not a finite number'),
+        ])
+
+    def test_report_rows_are_csv_line_numbers_across_blank_lines(self):
+        validation = validate(HEADER + "P1,Pump,90,5,100\n\n\nP2,Pump,bad,5,100\n\nP3,Pump,90,5,100\n")
+        self.assertEqual(validation.rows_checked, 3)
+        self.assertEqual(errors(validation), [(5, 'Flowrate', 'not a number')])
+
+    def test_header_aliases(self):
+        validation = validate("equipment_name, TYPE ,Flow Rate,pressure,Temp\nP1,Pump,90,5,100\n")
+        self.assertEqual(list(validation.clean.columns), list(DEFAULT_RULES))
+        self.assertEqual(validation.rows_rejected, 0)
+
+        validation, error = validate_equipment_csv(io.StringIO("Label,Kind,Flow\nP1,Pump,90\n"))
+        self.assertIsNone(validation)
+        self.assertEqual(error, "Missing required columns: Equipment Name, Type, Pressure, Temperature")
+
+    @override_settings(EQUIPMENT_VALIDATION_RULES={
+        **DEFAULT_RULES,
+        'Type': {'aliases': ['type'], 'allowed': ['Pump', 'Valve']},
+        'Equipment Name': {'aliases': [], 'pattern': r'[A-Z]\d+'},
+        'Pressure': {'aliases': [], 'numeric': True, 'min': 0, 'max': 10},
+    })
+    def test_rules_from_settings(self):
+        validation = validate(HEADER + "P1,Pump,90,5,100\nP2,Mixer,90,5,100\npump-3,Pump,90,5,100\nP4,Valve,90,11,100\n")
+        self.assertEqual(errors(validation), [
+            (3, 'Type', 'not an allowed value'),
+            (4, 'Equipment Name', 'does not match pattern'),
+            (5, 'Pressure', 'above maximum 10'),
+        ])
+
+
+@override_settings(EQUIPMENT_ADMISSION_ENABLED=False)
+class ValidationReportTests(TestCase):
+
+    def upload(self, text):
+        csv_file = io.StringIO(HEADER + text)
+        csv_file.name = 'plant.csv'
+        return self.client.post('/api/upload/', {'file': csv_file})
+
+    def test_infinite_values_are_not_stored(self):
+        response = self.upload("P1,Pump,inf,5,100\nP2,Pump,90,5,100\n")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Equipment.objects.count(), 1)
+        # Strict JSON: Infinity and NaN would fail to parse
+        summary = json.loads(self.client.get('/api/summary/').content, parse_constant=self.fail)
+        self.assertEqual(summary['averages']['avg_flowrate'], 90.0)
+
+    def test_download(self):
+        validation = self.upload("P1,Pump,90,5,100\n\nP2,Pump,bad,5,100\n").json()['validation']
+        self.assertEqual((validation['rows_checked'], validation['rows_rejected']), (2, 1))
+
+        response = self.client.get(f"/api/validation/{validation['report_id']}/")
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="plant_errors.csv"')
+        self.assertEqual(response.content.decode(), "row,column,value,error\n4,Flowrate,bad,not a number\n")
+
+    def test_other_tenants_reports_are_not_found(self):
+        report_id = self.upload("P1,Pump,bad,5,100\n").json()['validation']['report_id']
+        token = Token.objects.create(user=User.objects.create_user('alice'))
+        response = self.client.get(f'/api/validation/{report_id}/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/api/validation/999999/').status_code, 404)
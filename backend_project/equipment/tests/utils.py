@@ -0,0 +1,24 @@
+"""Fixtures shared by the equipment test modules"""
+import numpy as np
+import pandas as pd
+from ..bulk_loader import bulk_load_equipment
+from ..models import Dataset
+
+COLUMNS = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+
+
+def make_dataset(tenant, rows, filename='test.csv'):
+    """Dataset for a tenant with rows of (name, type, flowrate, pressure, temperature)"""
+    dataset = Dataset.objects.create(filename=filename, tenant=tenant, total_records=len(rows))
+    bulk_load_equipment(dataset, {column: [row[i] for row in rows] for i, column in enumerate(COLUMNS)})
+    return dataset
+
+
+def random_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'equipment_type': rng.choice(['Pump', 'Valve', 'Reactor'], rows),
+        'flowrate': rng.uniform(50, 250, rows),
+        'pressure': rng.uniform(2, 15, rows),
+        'temperature': rng.normal(115, 15, rows),
+    })
@@ -1,13 +1,23 @@
 from django.urls import path
-from .views import upload_csv, get_summary, get_equipment_list, get_dataset_history, generate_pdf_report
+from .views import (upload_csv, get_validation_report, get_summary, get_trend, get_equipment_list, get_dataset_history, generate_pdf_report,
+                    run_query, open_live, append_live, close_live, live_events, get_admission_metrics)
 from .auth_views import login, register, logout, user_info
 
 urlpatterns = [
     path("upload/", upload_csv, name="upload_csv"),
+    path("validation/<int:report_id>/", get_validation_report, name="validation_report"),
     path("summary/", get_summary, name="get_summary"),
+    path("trend/", get_trend, name="get_trend"),
     path("equipment/", get_equipment_list, name="equipment_list"),
     path("datasets/", get_dataset_history, name="dataset_history"),
     path("report/pdf/", generate_pdf_report, name="generate_pdf_report"),
+    path("query/", run_query, name="run_query"),
+    path("admission/", get_admission_metrics, name="admission_metrics"),
+    # Live ingestion endpoints
+    path("live/", open_live, name="open_live"),
+    path("live/<int:dataset_id>/append/", append_live, name="append_live"),
+    path("live/<int:dataset_id>/close/", close_live, name="close_live"),
+    path("live/<int:dataset_id>/events/", live_events, name="live_events"),
     # Authentication endpoints
     path("auth/login/", login, name="login"),
     path("auth/register/", register, name="register"),
@@ -0,0 +1,254 @@
+import gzip
+import re
+import tempfile
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from .models import ValidationReport
+from .tenancy import PUBLIC_TENANT
+
+# Declarative rules keyed by canonical CSV header. Override with
+# EQUIPMENT_VALIDATION_RULES in settings.
+DEFAULT_RULES = {
+    'Equipment Name': {
+        'aliases': ['equipment_name', 'name', 'equipment'],
+        'pattern': r'.*\S.*',
+        'max_length': 200,
+    },
+    'Type': {
+        'aliases': ['equipment_type', 'equipment type', 'type'],
+        'allowed': None,
+        'max_length': 100,
+    },
+    'Flowrate': {
+        'aliases': ['flowrate', 'flow rate', 'flow'],
+        'numeric': True,
+        'min': 0,
+    },
+    'Pressure': {
+        'aliases': ['pressure'],
+        'numeric': True,
+        'min': 0,
+    },
+    'Temperature': {
+        'aliases': ['temperature', 'temp'],
+        'numeric': True,
+        'min': -273.15,
+    },
+}
+
+REPORT_COLUMNS = ['row', 'column', 'value', 'error']
+
+# Reports of fully rejected uploads (no dataset) kept around for download
+MAX_ORPHAN_REPORTS = 20
+
+
+def get_rules():
+    return getattr(settings, 'EQUIPMENT_VALIDATION_RULES', None) or DEFAULT_RULES
+
+
+def _normalize_header(name):
+    return re.sub(r'[\s_\-]+', '', str(name)).lower()
+
+
+def resolve_headers(columns, rules=None):
+    """Map incoming headers onto canonical names. Returns (rename_map, missing)."""
+    rules = rules or get_rules()
+    incoming = {_normalize_header(col): col for col in columns}
+    rename, missing = {}, []
+    for canonical, rule in rules.items():
+        candidates = [canonical] + rule.get('aliases', [])
+        match = next((incoming[_normalize_header(c)] for c in candidates if _normalize_header(c) in incoming), None)
+        if match is None:
+            missing.append(canonical)
+        elif match != canonical:
+            rename[match] = canonical
+    return rename, missing
+
+
+class ValidationResult:
+    """Rows that passed validation plus a long-form (row, column, value, error) report"""
+
+    def __init__(self, clean, errors, rows_checked):
+        self.clean = clean
+        self.errors = errors
+        self.rows_checked = rows_checked
+
+    @property
+    def rows_rejected(self):
+        return self.rows_checked - len(self.clean)
+
+    @property
+    def error_count(self):
+        return len(self.errors)
+
+    def preview(self, limit=10):
+        return self.errors.head(limit).to_dict(orient='records')
+
+    def to_csv_gz(self):
+        return gzip.compress(self.errors.to_csv(index=False).encode('utf-8'))
+
+
+class SpooledValidationResult:
+    """
+    Validation results accumulated chunk by chunk.
+
+    Only counts and a short preview stay in memory; the error report is
+    gzipped into a temporary file that moves to disk past SPOOL_MEMORY_BYTES.
+    Has the reporting interface of ValidationResult (no `clean` frame).
+    """
+
+    SPOOL_MEMORY_BYTES = 1024 * 1024
+
+    def __init__(self, preview_rows=10):
+        self.rows_checked = 0
+        self.rows_accepted = 0
+        self.error_count = 0
+        self.preview_rows = preview_rows
+        self._preview = []
+        self._spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_MEMORY_BYTES)
+        self._gzip = gzip.GzipFile(fileobj=self._spool, mode='wb')
+        self._gzip.write((','.join(REPORT_COLUMNS) + '\n').encode('utf-8'))
+
+    @property
+    def rows_rejected(self):
+        return self.rows_checked - self.rows_accepted
+
+    def add(self, result):
+        """Fold in the ValidationResult of one chunk"""
+        self.rows_checked += result.rows_checked
+        self.rows_accepted += len(result.clean)
+        self.error_count += result.error_count
+        if result.error_count:
+            self._gzip.write(result.errors.to_csv(index=False, header=False).encode('utf-8'))
+            if len(self._preview) < self.preview_rows:
+                self._preview.extend(result.preview(self.preview_rows - len(self._preview)))
+
+    def preview(self, limit=10):
+        return self._preview[:limit]
+
+    def to_csv_gz(self):
+        if not self._gzip.closed:
+            self._gzip.close()
+        self._spool.seek(0)
+        return self._spool.read()
+
+    def close(self):
+        if not self._gzip.closed:
+            self._gzip.close()
+        self._spool.close()
+
+
+def drop_blank_lines(df):
+    """
+    Drop the rows of blank lines from a CSV read with skip_blank_lines=False.
+
+    The index is kept, so df.index + 2 stays the CSV line number (the header
+    is line 1); pandas' default skipping would shift every later row up.
+    """
+    return df[df.notna().any(axis=1).to_numpy()]
+
+
+def validate_frame(df, rules=None):
+    """
+    Apply the rules to a freshly read DataFrame, column by column.
+
+    Every check is a vectorized mask over the whole column. Report rows are
+    df.index + 2: CSV line numbers for a frame read with its header on line 1
+    and blank lines dropped by drop_blank_lines. Headers must already be
+    canonical (see resolve_headers).
+    """
+    rules = rules or get_rules()
+    clean = df[list(rules)].copy()
+    rejected = np.zeros(len(df), dtype=bool)
+    reports = []
+
+    def report(mask, column, values, message):
+        nonlocal rejected
+        mask = np.asarray(mask, dtype=bool)
+        if not mask.any():
+            return
+        rejected |= mask
+        reports.append(pd.DataFrame({
+            'row': df.index[mask] + 2,
+            'column': column,
+            'value': values[mask].fillna('').astype(str).to_numpy(),
+            'error': message,
+        }))
+
+    for column, rule in rules.items():
+        raw = df[column]
+        missing = raw.isna().to_numpy()
+        report(missing, column, raw, 'missing')
+
+        if rule.get('numeric'):
+            values = pd.to_numeric(raw, errors='coerce')
+            report(values.isna().to_numpy() & ~missing, column, raw, 'not a number')
+            # read_csv and to_numeric parse "inf", which would leak into stored rows and JSON
+            finite = np.isfinite(values.to_numpy(dtype=float))
+            report(values.notna().to_numpy() & ~finite, column, raw, 'not a finite number')
+            if rule.get('min') is not None:
+                report(finite & (values < rule['min']).to_numpy(), column, raw, f"below minimum {rule['min']}")
+            if rule.get('max') is not None:
+                report(finite & (values > rule['max']).to_numpy(), column, raw, f"above maximum {rule['max']}")
+            clean[column] = values.astype(float)
+        else:
+            text = raw.astype(str).str.strip()
+            present = ~missing
+            if rule.get('pattern'):
+                report(present & ~text.str.fullmatch(rule['pattern']).to_numpy(), column, raw, 'does not match pattern')
+            if rule.get('allowed'):
+                report(present & ~text.isin(rule['allowed']).to_numpy(), column, raw, 'not an allowed value')
+            if rule.get('max_length'):
+                report(present & (text.str.len() > rule['max_length']).to_numpy(), column, raw,
+                       f"longer than {rule['max_length']} characters")
+            clean[column] = text
+
+    errors = pd.concat(reports, ignore_index=True).sort_values('row', kind='stable') if reports \
+        else pd.DataFrame(columns=REPORT_COLUMNS)
+    return ValidationResult(clean[~rejected], errors.reset_index(drop=True), len(df))
+
+
+def validate_equipment_csv(csv_file, rules=None):
+    """Read and validate an uploaded CSV. Returns (ValidationResult, error)."""
+    rules = rules or get_rules()
+    try:
+        df = pd.read_csv(csv_file, skip_blank_lines=False)
+    except Exception as e:
+        return None, f"Error reading CSV: {str(e)}"
+
+    rename, missing = resolve_headers(df.columns, rules)
+    if missing:
+        return None, f"Missing required columns: {', '.join(missing)}"
+    return validate_frame(drop_blank_lines(df.rename(columns=rename)), rules), None
+
+
+def save_validation_report(validation, filename, dataset=None, tenant=PUBLIC_TENANT):
+    """Store the error report for an upload. Returns None when every row passed."""
+    if validation.error_count == 0:
+        return None
+    report = ValidationReport.objects.create(
+        dataset=dataset,
+        tenant=tenant,
+        filename=filename,
+        rows_checked=validation.rows_checked,
+        rows_rejected=validation.rows_rejected,
+        error_count=validation.error_count,
+        report=validation.to_csv_gz(),
+    )
+    # Reports attached to datasets go away with them; cap the rest per tenant
+    stale = (ValidationReport.objects.filter(tenant=tenant, dataset__isnull=True)
+             .values_list('id', flat=True)[MAX_ORPHAN_REPORTS:])
+    ValidationReport.objects.filter(id__in=list(stale)).delete()
+    return report
+
+
+def validation_payload(validation, report=None):
+    """Validation summary included in upload responses"""
+    return {
+        "rows_checked": validation.rows_checked,
+        "rows_rejected": validation.rows_rejected,
+        "error_count": validation.error_count,
+        "report_id": report.id if report else None,
+        "errors_preview": validation.preview(),
+    }
@@ -0,0 +1,8 @@
+# Views are split by endpoint group; pandas and ReportLab are imported inside
+# the views that use them so importing this package stays cheap.
+from .upload import upload_csv, get_validation_report
+from .summary import get_summary, get_trend, get_equipment_list, get_dataset_history
+from .report import generate_pdf_report
+from .query import run_query
+from .live import open_live, append_live, close_live, live_events
+from .admission import get_admission_metrics
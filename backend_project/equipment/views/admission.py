@@ -0,0 +1,12 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from ..admission import admission_metrics
+
+
+@csrf_exempt
+def get_admission_metrics(request):
+    """Admission-control counters for this worker process"""
+    if request.method == "GET":
+        return JsonResponse(admission_metrics())
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)
@@ -0,0 +1,135 @@
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.core.handlers.asgi import ASGIRequest
+from django.conf import settings
+from asgiref.sync import sync_to_async
+from ..models import Dataset
+from ..tenancy import TenantError, request_user, tenant_for
+from ..live import (parse_ndjson_readings, validate_readings, open_live_dataset, append_readings,
+                    close_live_dataset)
+from ..running_stats import RunningStats
+from datetime import datetime
+import json
+import asyncio
+
+
+@csrf_exempt
+def open_live(request):
+    """Open a live dataset that accepts streamed readings"""
+    if request.method == "POST":
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+
+        try:
+            payload = json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Body must be JSON"}, status=400)
+
+        filename = payload.get('filename') or f"live_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        dataset = open_live_dataset(filename, tenant, request_user(request))
+        return JsonResponse({"message": "Live dataset opened", "dataset_id": dataset.id}, status=201)
+
+    return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+
+@csrf_exempt
+def append_live(request, dataset_id):
+    """Append an NDJSON batch of readings to a live dataset"""
+    if request.method == "POST":
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+
+        if not Dataset.objects.filter(id=dataset_id, tenant=tenant, is_live=True).exists():
+            return JsonResponse({"error": "Live dataset not found"}, status=404)
+
+        columns, line_numbers, error = parse_ndjson_readings(request.body)
+        if not error:
+            columns, error = validate_readings(columns, line_numbers)
+        if error:
+            return JsonResponse({"error": error}, status=400)
+
+        try:
+            written = append_readings(dataset_id, columns)
+        except Dataset.DoesNotExist:
+            return JsonResponse({"error": "Live dataset not found"}, status=404)
+        return JsonResponse({"accepted": len(columns['equipment_name']), "written": written}, status=201)
+
+    return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+
+@csrf_exempt
+def close_live(request, dataset_id):
+    """Close a live dataset"""
+    if request.method == "POST":
+        try:
+            dataset = Dataset.objects.get(id=dataset_id, tenant=tenant_for(request), is_live=True)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        except Dataset.DoesNotExist:
+            return JsonResponse({"error": "Live dataset not found"}, status=404)
+
+        dataset = close_live_dataset(dataset)
+        return JsonResponse({
+            "message": "Live dataset closed",
+            "dataset_id": dataset.id,
+            "summary": RunningStats.from_dict(dataset.live_stats).summary(),
+        })
+
+    return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+
+def _sse_event(summary):
+    return f"event: summary\ndata: {json.dumps(summary)}\n\n"
+
+
+@csrf_exempt
+async def live_events(request, dataset_id):
+    """Server-sent events with running summary updates for a live dataset"""
+    if request.method != "GET":
+        return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+    try:
+        tenant = await sync_to_async(tenant_for)(request)
+    except TenantError as e:
+        return JsonResponse({"error": str(e)}, status=e.status)
+
+    dataset = await Dataset.objects.filter(id=dataset_id, tenant=tenant).values('live_stats', 'is_live').afirst()
+    if dataset is None or dataset['live_stats'] is None:
+        return JsonResponse({"error": "Live dataset not found"}, status=404)
+
+    poll_interval = getattr(settings, 'LIVE_SSE_POLL_INTERVAL', 1.0)
+    max_seconds = getattr(settings, 'LIVE_SSE_MAX_SECONDS', 300)
+    retry_ms = int(poll_interval * 1000)
+
+    if not isinstance(request, ASGIRequest):
+        # WSGI workers can't hold a stream open; send one snapshot and let EventSource reconnect
+        body = f"retry: {retry_ms}\n" + _sse_event(RunningStats.from_dict(dataset['live_stats']).summary())
+        return HttpResponse(body, content_type='text/event-stream')
+
+    async def stream():
+        yield f"retry: {retry_ms}\n"
+        last_count = None
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_seconds
+        while loop.time() < deadline:
+            current = await Dataset.objects.filter(id=dataset_id).values('live_stats', 'is_live').afirst()
+            if current is None:
+                break
+            stats = RunningStats.from_dict(current['live_stats'])
+            if stats.count != last_count:
+                last_count = stats.count
+                yield _sse_event(stats.summary())
+            else:
+                yield ": keepalive\n\n"
+            if not current['is_live']:
+                break
+            await asyncio.sleep(poll_interval)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,30 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from ..admission import admission_controlled
+from ..tenancy import TenantError, tenant_for
+import json
+
+
+@csrf_exempt
+@admission_controlled('query')
+def run_query(request):
+    """Run an ad-hoc aggregate query over the caller's equipment rows"""
+    if request.method == "POST":
+        from ..queries import QueryError, execute_query
+        
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        try:
+            spec = json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return JsonResponse({"error": "Body must be JSON"}, status=400)
+        
+        try:
+            return JsonResponse(execute_query(tenant, spec))
+        except QueryError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+    
+    return JsonResponse({"error": "Only POST allowed"}, status=405)
@@ -0,0 +1,228 @@
+from django.http import JsonResponse, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.db.models import Sum
+from ..admission import admission_controlled
+from ..budgets import BudgetExceeded, FRAME_ROW_BYTES, memory_budgeted
+from ..models import Equipment, Dataset
+from ..tenancy import TenantError, tenant_for
+from datetime import datetime
+import io
+
+
+def _report_statistics(equipment, rows, budget):
+    """
+    Per-field (mean, min, max, std), type counts and the first 20 rows for a report.
+
+    Selections that don't fit the memory budget are reduced in primary-key
+    ranges across the process pool; only the rows listed in the report are
+    loaded as records.
+    """
+    import pandas as pd
+    from ..parallel_stats import get_chunk_rows, get_workers, reduce_queryset
+    from ..running_stats import NUMERIC_FIELDS
+    
+    budget.check_rows(rows, "Pick a dataset_id to report on one dataset.")
+    columns = ['equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature']
+    
+    if budget.fits(rows * FRAME_ROW_BYTES):
+        df = pd.DataFrame(list(equipment.values(*columns)))
+        budget.check("loading equipment rows")
+        stats = {
+            field: (df[field].mean(), df[field].min(), df[field].max(), df[field].std() if len(df) > 1 else 0.0)
+            for field in NUMERIC_FIELDS
+        }
+        return stats, df['equipment_type'].value_counts().to_dict(), df.head(20)
+    
+    workers = get_workers()
+    chunk_rows = budget.chunk_rows(default=get_chunk_rows(), in_flight=2 * workers)
+    total = reduce_queryset(equipment, workers, chunk_rows, check=lambda: budget.check("building the report"))
+    stats = {}
+    for field in NUMERIC_FIELDS:
+        moments = total.fields[field]
+        std = (moments['m2'] / (total.count - 1)) ** 0.5 if total.count > 1 else 0.0
+        stats[field] = (moments['sum'] / total.count, moments['min'], moments['max'], std)
+    type_counts = dict(sorted(total.type_counts.items(), key=lambda item: -item[1]))
+    return stats, type_counts, pd.DataFrame(list(equipment.values(*columns)[:20]), columns=columns)
+
+
+@csrf_exempt
+@admission_controlled('report')
+@memory_budgeted('report')
+def generate_pdf_report(request):
+    """Generate PDF report with equipment summary and statistics"""
+    if request.method == "GET":
+        # ReportLab is only needed here (pandas in _report_statistics); load them on first use
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib.enums import TA_CENTER
+        
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        try:
+            dataset_id = request.GET.get('dataset_id')
+            
+            # Get equipment data
+            datasets = Dataset.objects.filter(tenant=tenant)
+            if dataset_id:
+                dataset = datasets.filter(id=dataset_id).first()
+                if dataset is None:
+                    return JsonResponse({"error": "Dataset not found"}, status=404)
+                datasets = datasets.filter(id=dataset_id)
+                equipment = Equipment.objects.filter(tenant=tenant, dataset_id=dataset_id)
+                report_title = f"Equipment Report - {dataset.filename}"
+            else:
+                equipment = Equipment.objects.filter(tenant=tenant)
+                report_title = "Complete Equipment Report"
+            
+            if not equipment.exists():
+                return JsonResponse({"error": "No equipment data found"}, status=404)
+            
+            # Statistics come from chunks when the rows don't fit the memory budget
+            rows = datasets.aggregate(rows=Sum('total_records'))['rows'] or 0
+            stats, type_counts, top_rows = _report_statistics(equipment, rows, request.memory_budget)
+            total_count = sum(type_counts.values())
+            
+            # Create PDF in memory
+            buffer = io.BytesIO()
+            doc = SimpleDocTemplate(buffer, pagesize=letter, 
+                                   rightMargin=72, leftMargin=72,
+                                   topMargin=72, bottomMargin=18)
+            
+            # Container for PDF elements
+            elements = []
+            styles = getSampleStyleSheet()
+            
+            # Add custom styles
+            title_style = ParagraphStyle(
+                'CustomTitle',
+                parent=styles['Heading1'],
+                fontSize=24,
+                textColor=colors.HexColor('#1e40af'),
+                spaceAfter=30,
+                alignment=TA_CENTER
+            )
+            
+            heading_style = ParagraphStyle(
+                'CustomHeading',
+                parent=styles['Heading2'],
+                fontSize=16,
+                textColor=colors.HexColor('#1e40af'),
+                spaceAfter=12,
+                spaceBefore=12
+            )
+            
+            # Title
+            elements.append(Paragraph(report_title, title_style))
+            elements.append(Spacer(1, 12))
+            
+            # Report metadata
+            report_date = datetime.now().strftime("%B %d, %Y %H:%M:%S")
+            elements.append(Paragraph(f"<b>Generated:</b> {report_date}", styles['Normal']))
+            elements.append(Paragraph(f"<b>Total Equipment:</b> {total_count}", styles['Normal']))
+            elements.append(Spacer(1, 20))
+            
+            # Summary Statistics Section
+            elements.append(Paragraph("Summary Statistics", heading_style))
+            
+            fields = ['flowrate', 'pressure', 'temperature']
+            summary_data = [['Metric', 'Flowrate', 'Pressure', 'Temperature']]
+            for i, metric in enumerate(['Average', 'Minimum', 'Maximum', 'Std Dev']):
+                summary_data.append([metric] + [f"{stats[field][i]:.2f}" for field in fields])
+            
+            summary_table = Table(summary_data, colWidths=[2*inch, 1.5*inch, 1.5*inch, 1.5*inch])
+            summary_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+                ('FONTNAME', (0, 1), (0, -1), 'Helvetica-Bold'),
+            ]))
+            
+            elements.append(summary_table)
+            elements.append(Spacer(1, 20))
+            
+            # Equipment Type Distribution
+            elements.append(Paragraph("Equipment Type Distribution", heading_style))
+            
+            type_data = [['Equipment Type', 'Count', 'Percentage']]
+            for eq_type, count in type_counts.items():
+                percentage = (count / total_count) * 100
+                type_data.append([eq_type, str(count), f"{percentage:.1f}%"])
+            
+            type_table = Table(type_data, colWidths=[3*inch, 1.5*inch, 1.5*inch])
+            type_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, 0), 12),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ]))
+            
+            elements.append(type_table)
+            elements.append(Spacer(1, 20))
+            
+            # Equipment List (First 20 records)
+            elements.append(Paragraph("Equipment List (Top 20)", heading_style))
+            
+            equipment_data = [['Name', 'Type', 'Flowrate', 'Pressure', 'Temp']]
+            for index, row in top_rows.iterrows():
+                equipment_data.append([
+                    row['equipment_name'][:20],  # Truncate long names
+                    row['equipment_type'][:15],
+                    f"{row['flowrate']:.2f}",
+                    f"{row['pressure']:.2f}",
+                    f"{row['temperature']:.2f}"
+                ])
+            
+            equipment_table = Table(equipment_data, colWidths=[2*inch, 1.5*inch, 1*inch, 1*inch, 1*inch])
+            equipment_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1e40af')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ]))
+            
+            elements.append(equipment_table)
+            
+            # Add footer
+            elements.append(Spacer(1, 30))
+            footer_text = "Chemical Equipment Visualizer - Automated Report Generation"
+            elements.append(Paragraph(footer_text, styles['Normal']))
+            
+            # Build PDF
+            doc.build(elements)
+            
+            # Get PDF data
+            pdf_data = buffer.getvalue()
+            buffer.close()
+            
+            # Return PDF response
+            response = HttpResponse(pdf_data, content_type='application/pdf')
+            filename = f"equipment_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+            response['Content-Disposition'] = f'attachment; filename="{filename}"'
+            
+            return response
+            
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)
@@ -0,0 +1,192 @@
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.db.models import Sum
+from ..budgets import FRAME_ROW_BYTES, memory_budgeted
+from ..models import Equipment, Dataset, EquipmentRollup
+from ..caching import get_tenant_summary
+from ..tenancy import TenantError, tenant_for
+
+
+def _summarize(equipment, rollups, rows, budget):
+    """Summary payload for a tenant's equipment rows plus its compacted history"""
+    import pandas as pd
+    from ..parallel_stats import get_chunk_rows, get_min_rows, get_workers, reduce_queryset, stored_summary
+    from ..rollups import equipment_frame, summarize_with_rollups, summarize_aggregate_with_rollups
+    
+    budget.check_rows(rows, "Pass a dataset_id to summarize one dataset.")
+    # Selections over the memory budget or PARALLEL_STATS_MIN_ROWS are reduced in
+    # primary-key ranges across the process pool, sized so the chunks in flight fit the budget.
+    # `rows` comes from the dataset totals, so deciding costs no query on the equipment table
+    chunked = not budget.fits(rows * FRAME_ROW_BYTES) or rows >= get_min_rows()
+    
+    if chunked:
+        workers = get_workers()
+        chunk_rows = budget.chunk_rows(default=get_chunk_rows(), in_flight=2 * workers)
+        total = reduce_queryset(equipment, workers, chunk_rows, check=lambda: budget.check("summarizing in chunks"))
+    
+    # Compacted history is combined with raw rows (median becomes approximate)
+    if rollups.exists():
+        if chunked:
+            return summarize_aggregate_with_rollups(total, total.type_counts, rollups)
+        return summarize_with_rollups(equipment_frame(equipment.order_by()), rollups)
+    
+    if not equipment.exists():
+        return {
+            "total_count": 0,
+            "averages": {},
+            "type_distribution": {},
+            "message": "No equipment data found"
+        }
+    
+    if chunked:
+        return stored_summary(total)
+    
+    # Calculate statistics
+    data = list(equipment.values('equipment_name', 'equipment_type', 'flowrate', 'pressure', 'temperature'))
+    df = pd.DataFrame(data)
+    budget.check("loading equipment rows")
+    
+    summary = {
+        "total_count": len(df),
+        "averages": {
+            "avg_flowrate": round(df['flowrate'].mean(), 2),
+            "avg_pressure": round(df['pressure'].mean(), 2),
+            "avg_temperature": round(df['temperature'].mean(), 2),
+        },
+        "type_distribution": df['equipment_type'].value_counts().to_dict(),
+        "statistics": {
+            "flowrate": {
+                "min": round(df['flowrate'].min(), 2),
+                "max": round(df['flowrate'].max(), 2),
+                "median": round(df['flowrate'].median(), 2),
+                "std": round(df['flowrate'].std(), 2) if len(df) > 1 else 0,
+            },
+            "pressure": {
+                "min": round(df['pressure'].min(), 2),
+                "max": round(df['pressure'].max(), 2),
+                "median": round(df['pressure'].median(), 2),
+                "std": round(df['pressure'].std(), 2) if len(df) > 1 else 0,
+            },
+            "temperature": {
+                "min": round(df['temperature'].min(), 2),
+                "max": round(df['temperature'].max(), 2),
+                "median": round(df['temperature'].median(), 2),
+                "std": round(df['temperature'].std(), 2) if len(df) > 1 else 0,
+            }
+        }
+    }
+    
+    return summary
+
+
+@csrf_exempt
+@memory_budgeted('summary')
+def get_summary(request):
+    """Get summary statistics of all equipment or specific dataset"""
+    if request.method == "GET":
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        dataset_id = request.GET.get('dataset_id')
+        
+        datasets = Dataset.objects.filter(tenant=tenant)
+        if dataset_id:
+            datasets = datasets.filter(id=dataset_id)
+            if not datasets.exists():
+                return JsonResponse({"error": "Dataset not found"}, status=404)
+            equipment = Equipment.objects.filter(tenant=tenant, dataset_id=dataset_id)
+            rollups = EquipmentRollup.objects.none()
+        else:
+            equipment = Equipment.objects.filter(tenant=tenant)
+            rollups = EquipmentRollup.objects.filter(tenant=tenant)
+        # Dataset totals size the work without scanning the equipment table
+        rows = datasets.aggregate(rows=Sum('total_records'))['rows'] or 0
+        
+        # Cached per tenant, keyed on the tenant's current dataset state
+        summary = get_tenant_summary(tenant, dataset_id or 'all',
+                                     lambda: _summarize(equipment, rollups, rows, request.memory_budget))
+        return JsonResponse(summary)
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+
+@csrf_exempt
+def get_trend(request):
+    """Get per-time-bucket counts and averages across raw data and compacted history"""
+    if request.method == "GET":
+        from ..rollups import trend, get_bucket_seconds
+        
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        rollup_seconds = get_bucket_seconds()
+        try:
+            bucket_seconds = int(request.GET.get('bucket_seconds', rollup_seconds))
+        except ValueError:
+            return JsonResponse({"error": "bucket_seconds must be an integer"}, status=400)
+        
+        if bucket_seconds <= 0 or bucket_seconds % rollup_seconds:
+            return JsonResponse(
+                {"error": f"bucket_seconds must be a positive multiple of {rollup_seconds}"},
+                status=400
+            )
+        
+        buckets = trend(bucket_seconds, tenant, request.GET.get('equipment_type'))
+        return JsonResponse({"bucket_seconds": bucket_seconds, "buckets": buckets})
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+
+@csrf_exempt
+def get_equipment_list(request):
+    """Get list of all equipment or from specific dataset"""
+    if request.method == "GET":
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        dataset_id = request.GET.get('dataset_id')
+        
+        if dataset_id:
+            equipment = Equipment.objects.filter(tenant=tenant, dataset_id=dataset_id)
+        else:
+            equipment = Equipment.objects.filter(tenant=tenant)[:100]  # Limit to 100 for performance
+        
+        data = list(equipment.values(
+            'id', 'equipment_name', 'equipment_type', 
+            'flowrate', 'pressure', 'temperature', 'uploaded_at'
+        ))
+        
+        return JsonResponse({"data": data}, safe=False)
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)
+
+
+@csrf_exempt
+def get_dataset_history(request):
+    """Get list of last 5 uploaded datasets"""
+    if request.method == "GET":
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        datasets = Dataset.objects.filter(tenant=tenant)[:5]
+        
+        data = []
+        for ds in datasets:
+            data.append({
+                "id": ds.id,
+                "filename": ds.filename,
+                "uploaded_at": ds.uploaded_at.isoformat(),
+                "total_records": ds.total_records
+            })
+        
+        return JsonResponse({"datasets": data})
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)
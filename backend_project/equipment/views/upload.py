@@ -0,0 +1,191 @@
+from django.http import JsonResponse, HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.db import transaction
+from ..admission import admission_controlled
+from ..budgets import BudgetExceeded, CSV_BYTES_FACTOR, memory_budgeted
+from ..models import Dataset, ValidationReport
+from ..bulk_loader import bulk_load_equipment
+from ..caching import invalidate_equipment_types
+from ..tenancy import TenantError, request_user, tenant_for, enforce_retention
+
+
+def _normalize_summary(summary):
+    """Normalize summary keys to match frontend expectations"""
+    return {
+        "total_count": summary.get("total_equipment", 0),
+        "averages": {
+            "avg_flowrate": summary.get("avg_flowrate", 0),
+            "avg_pressure": summary.get("avg_pressure", 0),
+            "avg_temperature": summary.get("avg_temperature", 0),
+        },
+        "type_distribution": summary.get("equipment_type_distribution", {}),
+        "statistics": summary.get("statistics", {}),
+        "risk_distribution": summary.get("risk_distribution", {}),
+    }
+
+
+def _enforce_retention(tenant, budget):
+    """Compact over-quota history within the upload's memory budget"""
+    mode = budget.mode
+    try:
+        enforce_retention(tenant, budget)
+    except BudgetExceeded:
+        # The upload is already stored; the next upload or compact_history retries
+        pass
+    finally:
+        # `processing` describes the upload, not the compaction
+        budget.mode = mode
+
+
+def _upload_in_chunks(request, csv_file, tenant):
+    """Upload path for files whose in-memory parse wouldn't fit the request's memory budget"""
+    import pandas as pd
+    from ..ingest import ingest_csv_chunked
+    from ..parallel_stats import analysis_summary
+    from ..validation import resolve_headers, save_validation_report, validation_payload
+    
+    budget = request.memory_budget
+    try:
+        header = pd.read_csv(csv_file, nrows=0).columns
+        csv_file.seek(0)
+    except Exception as e:
+        return JsonResponse({"error": f"Error reading CSV: {str(e)}"}, status=400)
+    _, missing = resolve_headers(header)
+    if missing:
+        return JsonResponse({"error": f"Missing required columns: {', '.join(missing)}"}, status=400)
+    
+    try:
+        with transaction.atomic():
+            dataset = Dataset.objects.create(filename=csv_file.name, tenant=tenant, owner=request_user(request))
+            total, validation = ingest_csv_chunked(csv_file, dataset, budget)
+            if total.count:
+                dataset.total_records = total.count
+                dataset.save(update_fields=['total_records'])
+            else:
+                transaction.set_rollback(True)
+    except pd.errors.ParserError as e:
+        return JsonResponse({"error": f"Error reading CSV: {str(e)}"}, status=400)
+    
+    try:
+        if total.count == 0:
+            report = save_validation_report(validation, csv_file.name, tenant=tenant)
+            return JsonResponse({
+                "error": "No valid rows in CSV",
+                "validation": validation_payload(validation, report)
+            }, status=400)
+        report = save_validation_report(validation, csv_file.name, dataset, tenant=tenant)
+    finally:
+        validation.close()
+    
+    _enforce_retention(tenant, budget)
+    invalidate_equipment_types()
+    
+    return JsonResponse({
+        "message": "CSV uploaded successfully",
+        "dataset_id": dataset.id,
+        "summary": _normalize_summary(analysis_summary(total)),
+        "validation": validation_payload(validation, report),
+        "processing": budget.describe()
+    }, status=201)
+
+
+@csrf_exempt
+@admission_controlled('upload')
+@memory_budgeted('upload')
+def upload_csv(request):
+    """Upload CSV file and store equipment data"""
+    if request.method == "POST":
+        # pandas-backed helpers load on the first upload, not at worker start
+        from ..data_analysis import analyze_equipment_frame, parse_csv_to_equipment_columns
+        from ..validation import validate_equipment_csv, save_validation_report, validation_payload
+        
+        try:
+            tenant = tenant_for(request)
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        
+        try:
+            if 'file' not in request.FILES:
+                return JsonResponse({"error": "No file uploaded"}, status=400)
+            
+            csv_file = request.FILES['file']
+            
+            # Validate file extension
+            if not csv_file.name.endswith('.csv'):
+                return JsonResponse({"error": "File must be a CSV"}, status=400)
+            
+            # Files too big to parse in memory within the budget are processed in chunks
+            budget = request.memory_budget
+            if not budget.fits(csv_file.size * CSV_BYTES_FACTOR):
+                return _upload_in_chunks(request, csv_file, tenant)
+            
+            # Validate rows; rejected rows are listed in a downloadable report
+            validation, error = validate_equipment_csv(csv_file)
+            if error:
+                return JsonResponse({"error": error}, status=400)
+            budget.check_rows(validation.rows_checked, "Split the file into smaller uploads.")
+            budget.check("validating the CSV")
+            
+            if validation.clean.empty:
+                report = save_validation_report(validation, csv_file.name, tenant=tenant)
+                return JsonResponse({
+                    "error": "No valid rows in CSV",
+                    "validation": validation_payload(validation, report)
+                }, status=400)
+            
+            # Analyze the validated rows
+            summary = analyze_equipment_frame(validation.clean)
+
+            budget.check("analyzing the CSV")
+            
+            # Create the dataset and its rows together; summaries are cached by dataset state
+            with transaction.atomic():
+                dataset = Dataset.objects.create(
+                    filename=csv_file.name,
+                    total_records=len(validation.clean),
+                    tenant=tenant,
+                    owner=request_user(request)
+                )
+                
+                # Parse and save equipment data
+                equipment_columns = parse_csv_to_equipment_columns(validation.clean)
+                bulk_load_equipment(dataset, equipment_columns)
+            report = save_validation_report(validation, csv_file.name, dataset, tenant=tenant)
+            
+            # Compact this tenant's oldest datasets into rollups once it is over quota
+            _enforce_retention(tenant, budget)
+            invalidate_equipment_types()
+            
+            return JsonResponse({
+                "message": "CSV uploaded successfully",
+                "dataset_id": dataset.id,
+                "summary": _normalize_summary(summary),
+                "validation": validation_payload(validation, report),
+                "processing": budget.describe()
+            }, status=201)
+            
+        except BudgetExceeded:
+            raise
+        except Exception as e:
+            return JsonResponse({"error": str(e)}, status=500)
+    
+    return JsonResponse({"error": "Only POST allowed"}, status=405)
+
+
+@csrf_exempt
+def get_validation_report(request, report_id):
+    """Download the per-row validation errors of an upload as CSV"""
+    if request.method == "GET":
+        try:
+            report = ValidationReport.objects.get(id=report_id, tenant=tenant_for(request))
+        except TenantError as e:
+            return JsonResponse({"error": str(e)}, status=e.status)
+        except ValidationReport.DoesNotExist:
+            return JsonResponse({"error": "Validation report not found"}, status=404)
+        
+        response = HttpResponse(report.csv_text(), content_type='text/csv')
+        filename = report.filename.rsplit('.', 1)[0]
+        response['Content-Disposition'] = f'attachment; filename="{filename}_errors.csv"'
+        return response
+    
+    return JsonResponse({"error": "Only GET allowed"}, status=405)